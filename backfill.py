@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+dotenv_path = Path(__file__).parent / '.env'
+if dotenv_path.exists():
+    load_dotenv(dotenv_path=dotenv_path)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Run collect/build jobs from a JSONL file without going through Lambda")
+    parser.add_argument("jobs", help="JSONL file, one event detail per line")
+    parser.add_argument("--checkpoint",
+                        help="Progress log used to resume (default: <jobs>.checkpoint)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--openai-concurrency", type=int, default=8)
+    parser.add_argument("--embeddings-concurrency", type=int, default=8)
+    parser.add_argument("--gnews-concurrency", type=int, default=4)
+    parser.add_argument("--s3-concurrency", type=int, default=32)
+    parser.add_argument("--express-concurrency", type=int, default=4)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    from src.bulk.runner import run
+    report = run(
+        args.jobs,
+        args.checkpoint or f"{args.jobs}.checkpoint",
+        args.workers,
+        {
+            "openai": args.openai_concurrency,
+            "embeddings": args.embeddings_concurrency,
+            "gnews": args.gnews_concurrency,
+            "s3": args.s3_concurrency,
+            "express": args.express_concurrency,
+        },
+    )
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Per-article overhead of the collect path records: the old seven-key dicts
+(with `content` copied into `maintext` and the date parsed twice) against
+the slotted `Article` record.
+
+    python -m benchmarks.article_records --articles 20000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import attrgetter
+from typing import Any, Callable, Dict, List
+
+from src.models.article import Article, parse_publish_time
+
+
+def make_raw_articles(count: int) -> List[Dict[str, Any]]:
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "title": f"Headline number {i}",
+            "description": f"Short description for article {i}",
+            "content": f"Body text of article {i} " * 20,
+            "url": f"https://example.com/news/{i}",
+            "image": f"https://example.com/img/{i}.jpg",
+            "publishedAt": (start + timedelta(minutes=37 * i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "source": {"name": "Example Wire", "url": "https://example.com"},
+        }
+        for i in range(count)
+    ]
+
+
+def dict_pipeline(raw_articles: List[Dict[str, Any]]) -> Any:
+    news_list = []
+    for article in raw_articles:
+        processed = {
+            "title": article.get("title", ""),
+            "description": article.get("description", ""),
+            "content": article.get("content", ""),
+            "maintext": article.get("content", ""),
+            "url": article.get("url", ""),
+            "source": article.get("source", {}).get("name", ""),
+            "date_publish": article.get("publishedAt", ""),
+        }
+        if processed["maintext"]:
+            news_list.append(processed)
+
+    unique = [news for news in news_list if news.get("maintext")]
+    unique.sort(key=lambda news: parse_publish_time(news["date_publish"]))
+
+    groups = defaultdict(list)
+    for news in unique:
+        groups[parse_publish_time(news["date_publish"]).date()].append(news)
+    return unique, groups
+
+
+def record_pipeline(raw_articles: List[Dict[str, Any]]) -> Any:
+    articles = (Article.from_gnews(raw) for raw in raw_articles)
+    unique = sorted((a for a in articles if a.maintext), key=attrgetter("published"))
+    groups = [(date, list(group))
+              for date, group in groupby(unique, key=attrgetter("publish_date"))]
+    return unique, groups
+
+
+def measure(pipeline: Callable, raw_articles: List[Dict[str, Any]]) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = pipeline(raw_articles)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    count = len(raw_articles)
+    return {
+        "retained_bytes_per_article": retained / count,
+        "peak_bytes_per_article": peak / count,
+        "us_per_article": elapsed / count * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=20000)
+    args = parser.parse_args()
+
+    raw_articles = make_raw_articles(args.articles)
+    for name, pipeline in (("dict", dict_pipeline), ("record", record_pipeline)):
+        stats = measure(pipeline, raw_articles)
+        print(f"{name:>7}: retained {stats['retained_bytes_per_article']:8.1f} B/article, "
+              f"peak {stats['peak_bytes_per_article']:8.1f} B/article, "
+              f"{stats['us_per_article']:6.2f} us/article")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+First-event latency of a fresh container with and without priming at init.
+
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --event event.json
+
+Each run is a new interpreter that imports main.py the way the Lambda init
+phase does (PRIME_ON_INIT on or off), then handles two events. Without
+--event the "event" is a probe of the first calls a collect makes: list the
+provider's vector DB prefix, load the template, embed a string and reach
+GNews. Without credentials or network those calls fail fast, which still
+shows the client construction the unprimed path defers to the first event.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+CHILD = r"""
+import json, sys, time
+
+start = time.perf_counter()
+import main
+init_ms = (time.perf_counter() - start) * 1000
+
+event = json.loads(sys.argv[1]) if sys.argv[1] else None
+
+
+def probe():
+    if main.app is None:
+        main.app = main.get_app()
+    service = main.app.collector.service
+    for step in (lambda: service.s3.get_files_from_dir("probe/collection/vectordb/"),
+                 lambda: service.env.get_template("template.html"),
+                 lambda: service.openAI.embeddings.embed_query("probe"),
+                 lambda: service.gnews.session.head(service.gnews.BASE_URL, timeout=5)):
+        try:
+            step()
+        except Exception:
+            pass
+
+
+def first_event():
+    if event is None:
+        probe()
+    else:
+        main.lambda_handler(event, None)
+
+
+latencies = []
+for _ in range(2):
+    start = time.perf_counter()
+    first_event()
+    latencies.append((time.perf_counter() - start) * 1000)
+
+print("RESULT " + json.dumps({"init_ms": init_ms, "first_ms": latencies[0], "second_ms": latencies[1]}))
+"""
+
+
+def run_once(primed: bool, event: str) -> Dict[str, float]:
+    env = dict(os.environ, PRIME_ON_INIT="true" if primed else "false")
+    output = subprocess.run([sys.executable, "-c", CHILD, event], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    line = next(line for line in output.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--event", default="", help="JSON file of an event to handle")
+    args = parser.parse_args()
+
+    event = ""
+    if args.event:
+        with open(args.event, encoding="utf-8") as f:
+            event = json.dumps(json.load(f))
+
+    for primed in (False, True):
+        runs: List[Dict[str, Any]] = [run_once(primed, event) for _ in range(args.runs)]
+        medians = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print(f"{'primed' if primed else 'lazy':<7} init {medians['init_ms']:8.1f}ms  "
+              f"first event {medians['first_ms']:8.1f}ms  second event {medians['second_ms']:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Precision/recall of the duplicate check across a threshold sweep, with
+dedup throughput and index size for every vector store mode, and how many
+checks the SimHash prefilter settles before any embedding is made.
+
+    python -m benchmarks.dedup_eval --corpus pairs.jsonl
+    python -m benchmarks.dedup_eval --corpus pairs.jsonl --embedder openai --cache emb.json
+    python -m benchmarks.dedup_eval --synthetic 500
+
+The corpus is JSONL of {"a": text, "b": text, "duplicate": bool}. Every `a`
+goes into the store, then each `b` is checked against it the way
+`OpenAI.is_duplicate` does: embed, nearest neighbour, cosine similarity.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from lib.langchain.embeddings import CachedEmbeddings, HashingEmbeddings
+from lib.langchain.simhash import simhash
+from lib.langchain.vectorstore import STORAGE_MODES, build_index, nearest_similarity
+
+Pair = Tuple[str, str, bool]
+
+
+def load_corpus(path: str) -> List[Pair]:
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                pairs.append((entry["a"], entry["b"], bool(entry["duplicate"])))
+    return pairs
+
+
+def synthetic_corpus(count: int, seed: int = 0) -> List[Pair]:
+    """Wire copies with light edits as duplicates, unrelated stories otherwise"""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = ["".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(3000)]
+
+    def story() -> List[str]:
+        return rng.choices(vocabulary, k=rng.randint(60, 120))
+
+    pairs = []
+    for i in range(count):
+        words = story()
+        if i % 2 == 0:
+            edited = [w for w in words if rng.random() > 0.1]
+            edited += rng.choices(vocabulary, k=rng.randint(0, 10))
+            pairs.append((" ".join(words), " ".join(edited), True))
+        else:
+            pairs.append((" ".join(words), " ".join(story()), False))
+    return pairs
+
+
+def make_embedder(name: str, cache: str) -> Embeddings:
+    if name == "hashing":
+        embedder: Embeddings = HashingEmbeddings()
+    elif name == "openai":
+        from langchain_community.embeddings import OpenAIEmbeddings
+        embedder = OpenAIEmbeddings(api_key=os.environ.get("OPENAI_API_KEY", ""),
+                                    model="text-embedding-3-large")
+    else:
+        raise ValueError(f"Unknown embedder: {name}")
+    return CachedEmbeddings(embedder, cache) if cache else embedder
+
+
+def evaluate(pairs: List[Pair], embedder: Embeddings, mode: str) -> Dict[str, Any]:
+    stored = [a for a, _, _ in pairs]
+    dimension = len(embedder.embed_query(stored[0]))
+    db = FAISS(embedding_function=embedder, index=build_index(dimension, mode),
+               docstore=InMemoryDocstore({}), index_to_docstore_id={}, normalize_L2=True)
+    db.add_texts(stored)
+
+    start = time.perf_counter()
+    scores = []
+    for _, b, _ in pairs:
+        score = nearest_similarity(db, embedder.embed_query(b))
+        scores.append(-1.0 if score is None else score)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "scores": np.array(scores),
+        "articles_per_s": len(pairs) / elapsed if elapsed else 0.0,
+        "index_bytes": int(faiss.serialize_index(db.index).nbytes),
+    }
+
+
+def sweep(scores: np.ndarray, labels: np.ndarray, thresholds: List[float]) -> List[Dict[str, float]]:
+    rows = []
+    for threshold in thresholds:
+        predicted = scores >= threshold
+        true_positive = int(np.sum(predicted & labels))
+        rows.append({
+            "threshold": threshold,
+            "precision": true_positive / max(int(np.sum(predicted)), 1),
+            "recall": true_positive / max(int(np.sum(labels)), 1),
+        })
+    return rows
+
+
+def prefilter_sweep(pairs: List[Pair], distances: List[int]) -> List[Dict[str, float]]:
+    """Share of checks SimHash settles as copies, and how often it is right"""
+    bits = np.array([bin(simhash(a) ^ simhash(b)).count("1") for a, b, _ in pairs])
+    labels = np.array([duplicate for _, _, duplicate in pairs])
+    rows = []
+    for distance in distances:
+        settled = bits <= distance
+        rows.append({
+            "distance": distance,
+            "settled": float(np.mean(settled)),
+            "precision": int(np.sum(settled & labels)) / max(int(np.sum(settled)), 1),
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="Labeled pairs JSONL")
+    parser.add_argument("--synthetic", type=int, default=400,
+                        help="Number of generated pairs when no corpus is given")
+    parser.add_argument("--embedder", choices=("hashing", "openai"), default="hashing")
+    parser.add_argument("--cache", default="", help="JSON file of cached embeddings")
+    parser.add_argument("--thresholds", default="0.70,0.75,0.80,0.85,0.90,0.95")
+    parser.add_argument("--simhash-distances", default="3,6,8,10,12")
+    args = parser.parse_args()
+
+    pairs = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.synthetic)
+    labels = np.array([duplicate for _, _, duplicate in pairs])
+    thresholds = [float(t) for t in args.thresholds.split(",")]
+    embedder = make_embedder(args.embedder, args.cache)
+
+    print(f"{len(pairs)} pairs, {int(labels.sum())} duplicates, embedder {args.embedder}")
+    for mode in STORAGE_MODES:
+        result = evaluate(pairs, embedder, mode)
+        print(f"\n[{mode}] {result['articles_per_s']:.1f} articles/s, "
+              f"index {result['index_bytes'] / 1024:.1f} KiB")
+        for row in sweep(result["scores"], labels, thresholds):
+            print(f"  threshold {row['threshold']:.3f}: "
+                  f"precision {row['precision']:.3f} recall {row['recall']:.3f}")
+
+    print("\n[simhash prefilter]")
+    distances = [int(d) for d in args.simhash_distances.split(",")]
+    for row in prefilter_sweep(pairs, distances):
+        print(f"  distance {row['distance']:>2}: settles {row['settled']:.1%} of checks "
+              f"without embedding, precision {row['precision']:.3f}")
+
+    if isinstance(embedder, CachedEmbeddings):
+        embedder.save()
+
+
+if __name__ == "__main__":
+    main()
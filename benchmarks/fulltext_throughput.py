@@ -0,0 +1,101 @@
+"""
+Full-text extraction throughput against local fixture publishers.
+
+    python -m benchmarks.fulltext_throughput --articles 60 --domains 4 --latency 0.2
+    python -m benchmarks.fulltext_throughput --budget 1.5
+
+Each domain is a local HTTP server on its own port serving generated article
+pages after `--latency` seconds, so the per-domain pools and politeness
+limits apply the way they would against real publishers. The second pass
+over the same URLs is served from the extraction cache.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from lib.external.fulltext import FullText
+
+
+SENTENCES = [
+    "The company said on Tuesday that it would expand the program to several new markets.",
+    "Officials expect the changes to take effect before the end of the year.",
+    "Analysts have warned that the decision could weigh on earnings in the coming quarters.",
+    "Local residents told reporters they had not been consulted about the plan.",
+    "The announcement comes after months of negotiations between the two sides.",
+    "A spokesperson declined to comment on the details of the agreement.",
+    "Shares rose sharply in early trading after the news was made public.",
+    "Experts say the move reflects a broader shift in how the industry operates.",
+    "The government has promised to publish a full report later this month.",
+    "Critics argue that the measures do not go far enough to address the problem.",
+]
+
+
+def article_page(seed: int) -> bytes:
+    rng = random.Random(seed)
+    paragraphs = ["<p>" + " ".join(rng.choices(SENTENCES, k=rng.randint(3, 6))) + "</p>"
+                  for _ in range(8)]
+    return (
+        "<html><head><title>Fixture story {0}</title>"
+        "<meta property=\"article:published_time\" content=\"2025-01-01T00:00:00Z\"></head>"
+        "<body><nav>Home | World | Business</nav><article><h1>Fixture story {0}</h1>{1}</article>"
+        "<footer>Copyright fixture</footer></body></html>"
+    ).format(seed, "".join(paragraphs)).encode("utf-8")
+
+
+def serve(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            body = article_page(int(self.path.rsplit("/", 1)[-1]))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=60)
+    parser.add_argument("--domains", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per fixture response")
+    parser.add_argument("--budget", type=float, default=FullText.BUDGET_S)
+    parser.add_argument("--per-domain", type=int, default=FullText.PER_DOMAIN)
+    parser.add_argument("--interval", type=float, default=FullText.MIN_INTERVAL_S)
+    args = parser.parse_args()
+
+    FullText.PER_DOMAIN = args.per_domain
+    FullText.MIN_INTERVAL_S = args.interval
+
+    servers = [serve(args.latency) for _ in range(args.domains)]
+    urls: List[str] = [
+        f"http://127.0.0.1:{servers[i % len(servers)].server_address[1]}/story/{i}"
+        for i in range(args.articles)
+    ]
+
+    # Done at init_app in the service, so keep it out of the timings
+    FullText.warm()
+    try:
+        fulltext = FullText()
+        for label in ("cold", "cached"):
+            texts, report = fulltext.fetch_all(urls, budget_s=args.budget)
+            chars = sum(len(text) for text in texts.values())
+            print(f"[{label}] {json.dumps(report)}, {chars / max(len(texts), 1):.0f} chars/article")
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
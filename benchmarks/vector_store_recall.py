@@ -0,0 +1,56 @@
+"""
+Index size, load time and duplicate-decision recall of each vector store
+storage mode against the exact float32 index, at the duplicate threshold.
+
+    python -m benchmarks.vector_store_recall --vectors stored.npy --queries incoming.npy
+    python -m benchmarks.vector_store_recall --dimensions 1024
+
+Without .npy files it uses synthetic unit vectors, half of the queries being
+near-duplicates of stored ones.
+"""
+import argparse
+import json
+
+import numpy as np
+
+from lib.langchain.vectorstore import STORAGE_MODES, recall_check
+
+
+def synthetic(count: int, dimension: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    stored = rng.standard_normal((count, dimension)).astype("float32")
+    stored /= np.linalg.norm(stored, axis=1, keepdims=True)
+
+    # Half the queries sit around the threshold from a stored vector, half are fresh
+    half = count // 2
+    noise = rng.standard_normal((half, dimension)).astype("float32")
+    noise /= np.linalg.norm(noise, axis=1, keepdims=True)
+    mix = rng.uniform(0.45, 0.75, size=(half, 1)).astype("float32")
+    near = stored[:half] + mix * noise
+    fresh = rng.standard_normal((count - half, dimension)).astype("float32")
+    return stored, np.vstack([near, fresh])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", help=".npy of stored embeddings")
+    parser.add_argument("--queries", help=".npy of incoming embeddings")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--dimension", type=int, default=3072)
+    parser.add_argument("--dimensions", type=int, action="append",
+                        help="Reduced size to measure, may be repeated")
+    parser.add_argument("--threshold", type=float, default=0.85)
+    args = parser.parse_args()
+
+    if args.vectors and args.queries:
+        stored, incoming = np.load(args.vectors), np.load(args.queries)
+    else:
+        stored, incoming = synthetic(args.count, args.dimension)
+
+    for dimensions in [None] + (args.dimensions or []):
+        for mode in STORAGE_MODES:
+            print(json.dumps(recall_check(stored, incoming, mode, args.threshold, dimensions)))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,16 +13,56 @@ class BaseConfig:
     AWS_SECRET_KEY = os.environ.get('AWS_SECRET_KEY', '')
     AWS_BUCKET_NAME = os.environ.get('AWS_BUCKET_NAME', '')
 
+    # Collect runs that near the Lambda timeout checkpoint and re-enqueue
+    # themselves on this queue, keeping DEADLINE_RESERVE_MS for the handoff
+    CONTINUATION_QUEUE_URL = os.environ.get('CONTINUATION_QUEUE_URL', '')
+    DEADLINE_RESERVE_MS = int(os.environ.get('DEADLINE_RESERVE_MS', '15000') or 15000)
+
     # LANGCHAIN
     LANGSMITH_TRACING = os.environ.get('LANGSMITH_TRACING', '')
     LANGSMITH_ENDPOINT = os.environ.get('LANGSMITH_ENDPOINT', '')
     LANGSMITH_API_KEY = os.environ.get('LANGSMITH_API_KEY', '')
     LANGSMITH_PROJECT = os.environ.get('LANGSMITH_PROJECT', '')
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
+    # Reduced embedding size (0 keeps the model default) and index storage
+    # mode for the provider vector stores: flat, fp16 or sq8
+    EMBEDDING_DIMENSIONS = int(os.environ.get('EMBEDDING_DIMENSIONS', '0') or 0)
+    VECTOR_STORE_MODE = os.environ.get('VECTOR_STORE_MODE', 'flat')
+    DUPLICATE_THRESHOLD = float(os.environ.get('DUPLICATE_THRESHOLD', '0.85') or 0.85)
+    # Articles whose SimHash is within this many bits of one already seen are
+    # dropped as copies without an embedding call (-1 turns the prefilter off)
+    SIMHASH_MAX_DISTANCE = int(os.environ.get('SIMHASH_MAX_DISTANCE') or 8)
+
+    # Daily summaries: "sync" calls the chat model during collect, "batch"
+    # queues them for the OpenAI Batch API (BATCH_LOCAL_DIR swaps in a
+    # file-based stand-in)
+    SUMMARY_MODE = os.environ.get('SUMMARY_MODE', 'sync')
+    BATCH_LOCAL_DIR = os.environ.get('BATCH_LOCAL_DIR', '')
+
+    # Write the newsletter intro/outro during collect so build only renders
+    DIGEST_PREGENERATE_INTRO = os.environ.get('DIGEST_PREGENERATE_INTRO', 'false')
+
+    # Client-side rate limits shared by every caller in the process (0 means
+    # no fixed rate; concurrency still backs off on 429s from each service)
+    OPENAI_RPS = float(os.environ.get('OPENAI_RPS', '0') or 0)
+    OPENAI_TPM = float(os.environ.get('OPENAI_TPM', '0') or 0)
+    EMBEDDINGS_RPS = float(os.environ.get('EMBEDDINGS_RPS', '0') or 0)
+    EMBEDDINGS_TPM = float(os.environ.get('EMBEDDINGS_TPM', '0') or 0)
+    GNEWS_RPS = float(os.environ.get('GNEWS_RPS', '0') or 0)
+    S3_RPS = float(os.environ.get('S3_RPS', '0') or 0)
+    THROTTLE_MAX_CONCURRENCY = int(os.environ.get('THROTTLE_MAX_CONCURRENCY', '16') or 16)
 
     # GNEWS
     GNEWS_API_KEY = os.environ.get("GNEWS_API_KEY", '')
 
+    # Replace truncated GNews content with the publisher page's text, giving
+    # up after FULLTEXT_BUDGET_S; per-domain concurrency and spacing keep
+    # the fetches polite
+    FULLTEXT_ENABLED = os.environ.get('FULLTEXT_ENABLED', 'false')
+    FULLTEXT_BUDGET_S = float(os.environ.get('FULLTEXT_BUDGET_S', '20') or 20)
+    FULLTEXT_PER_DOMAIN = int(os.environ.get('FULLTEXT_PER_DOMAIN', '2') or 2)
+    FULLTEXT_MIN_INTERVAL_S = float(os.environ.get('FULLTEXT_MIN_INTERVAL_S', '0.25') or 0)
+
     # EXPRESS
     EXPRESS_END_POINT = os.environ.get("EXPRESS_END_POINT", '')
 
@@ -37,5 +77,8 @@ class BaseConfig:
         print(f"AWS_REGION: {cls.AWS_REGION}")
         print(f"OPENAI_API_KEY set: {bool(cls.OPENAI_API_KEY)}")
         print(f"GNEWS_API_KEY set: {bool(cls.GNEWS_API_KEY)}")
+        print(f"VECTOR_STORE_MODE: {cls.VECTOR_STORE_MODE}")
+        print(f"SUMMARY_MODE: {cls.SUMMARY_MODE}")
+        print(f"EMBEDDING_DIMENSIONS: {cls.EMBEDDING_DIMENSIONS or 'default'}")
         print(f"EXPRESS_END_POINT: {cls.EXPRESS_END_POINT}")
         print("=====================================")
@@ -1,6 +1,7 @@
 import requests
 import logging
 from typing import Any
+from lib.infra.throttle import Throttle, EXPRESS
 
 
 class Express:
@@ -9,6 +10,7 @@ class Express:
     def __init__(self):
         if not Express.API_END_POINT:
             print("Express API endpoint not initialized")
+        self.session = requests.Session()
 
     @classmethod
     def init_app(cls, app: Any) -> None:
@@ -16,19 +18,29 @@ class Express:
         if not cls.API_END_POINT:
             print("Express API endpoint not configured")
 
+    def warm(self) -> None:
+        """Open the pooled connection before the first dispatch"""
+        if Express.API_END_POINT:
+            self.session.head(Express.API_END_POINT, timeout=5)
+
     def dispatch_newsletter(self, provider_id: str, dispatch_date: str) -> bool:
         if not Express.API_END_POINT:
             raise ValueError("Express API endpoint not initialized")
             
         try:
-            response = requests.post(
-                f"{Express.API_END_POINT}/dispatch",
-                json={
-                    "providerId": provider_id,
-                    "dispatchDate": dispatch_date
-                }
-            )
-            response.raise_for_status()
+            def dispatch() -> requests.Response:
+                response = self.session.post(
+                    f"{Express.API_END_POINT}/dispatch",
+                    json={
+                        "providerId": provider_id,
+                        "dispatchDate": dispatch_date
+                    }
+                )
+                response.raise_for_status()
+                return response
+
+            # A dispatch that failed with a 5xx may still have gone out
+            Throttle.call(EXPRESS, dispatch, retry_transient=False)
             return True
             
         except requests.RequestException as e:
@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class FullText:
+    """
+    Fetches publisher pages and extracts the article body with news-please
+
+    Each domain gets its own pooled session, at most PER_DOMAIN requests in
+    flight and MIN_INTERVAL_S between request starts. Successful extractions
+    are cached by URL for the life of the process. `fetch_all` stops waiting
+    after BUDGET_S and leaves out whatever is still outstanding.
+    """
+    ENABLED: bool = False
+    BUDGET_S: float = 20.0
+    MAX_WORKERS: int = 16
+    PER_DOMAIN: int = 2
+    MIN_INTERVAL_S: float = 0.25
+    TIMEOUT_S: float = 8.0
+    CACHE_SIZE: int = 2048
+    USER_AGENT: str = "Mozilla/5.0 (compatible; InfoscribeBot/1.0)"
+
+    # URL -> extracted text, shared by every instance so a warm container
+    # doesn't fetch the same story twice; failures are left out so a
+    # transient error or a slow page gets another try
+    _cache: "OrderedDict[str, str]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @classmethod
+    def init_app(cls, app: Any) -> None:
+        cls.ENABLED = str(app.config.get("FULLTEXT_ENABLED", "false")).lower() in ("1", "true", "yes")
+        cls.BUDGET_S = float(app.config.get("FULLTEXT_BUDGET_S", 20.0) or 20.0)
+        cls.PER_DOMAIN = int(app.config.get("FULLTEXT_PER_DOMAIN", 2) or 2)
+        cls.MIN_INTERVAL_S = float(app.config.get("FULLTEXT_MIN_INTERVAL_S", 0.25) or 0)
+        print(f"Full-text enrichment {'enabled' if cls.ENABLED else 'disabled'} "
+              f"(budget {cls.BUDGET_S}s, {cls.PER_DOMAIN} per domain)")
+        if cls.ENABLED:
+            cls.warm()
+
+    @classmethod
+    def warm(cls) -> None:
+        """Load news-please and its extractors, which takes over a second the first time"""
+        try:
+            cls.extract("<html><body><p>Warm up.</p></body></html>", "http://localhost/")
+        except Exception as e:
+            print(f"Failed to warm up full-text extraction: {e}")
+
+    def _domain(self, domain: str):
+        with self._lock:
+            if domain not in self._sessions:
+                session = requests.Session()
+                # One pool per host, sized to the politeness limit
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=FullText.PER_DOMAIN)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = FullText.USER_AGENT
+                self._sessions[domain] = session
+                self._slots[domain] = threading.BoundedSemaphore(FullText.PER_DOMAIN)
+                self._next_start[domain] = 0.0
+            return self._sessions[domain], self._slots[domain]
+
+    def _wait_turn(self, domain: str, deadline: Optional[float]) -> bool:
+        """Wait out the domain's request spacing; False if that passes the deadline"""
+        with self._lock:
+            start = max(time.monotonic(), self._next_start[domain])
+            if deadline is not None and start >= deadline:
+                return False
+            self._next_start[domain] = start + FullText.MIN_INTERVAL_S
+        delay = start - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    @staticmethod
+    def extract(html: str, url: str) -> Optional[str]:
+        # Imported here so runs with enrichment off don't pay for it
+        from newsplease import NewsPlease
+        article = NewsPlease.from_html(html, url=url, fetch_images=False)
+        return article.maintext or None
+
+    def fetch(self, url: str, deadline: Optional[float] = None) -> Optional[str]:
+        """
+        Download and extract one article, going through the URL cache
+
+        Args:
+            url: Article page
+            deadline: time.monotonic() after which a queued fetch is dropped
+                instead of sent
+
+        Raises:
+            TimeoutError: The domain had no free turn before the deadline
+        """
+        with FullText._cache_lock:
+            if url in FullText._cache:
+                FullText._cache.move_to_end(url)
+                return FullText._cache[url]
+
+        domain = urlsplit(url).netloc
+        session, slot = self._domain(domain)
+        text = None
+        with slot:
+            if not self._wait_turn(domain, deadline):
+                # Nobody will wait for this; leave it uncached
+                raise TimeoutError(f"No turn for {domain} before the deadline")
+            try:
+                response = session.get(url, timeout=FullText.TIMEOUT_S)
+                response.raise_for_status()
+                text = self.extract(response.text, url)
+            except Exception as e:
+                print(f"Full-text extraction failed for {url}: {e}")
+
+        if text:
+            with FullText._cache_lock:
+                FullText._cache[url] = text
+                while len(FullText._cache) > FullText.CACHE_SIZE:
+                    FullText._cache.popitem(last=False)
+        return text
+
+    def fetch_all(self, urls: List[str], budget_s: Optional[float] = None
+                  ) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """
+        Extract as many of `urls` as the time budget allows
+
+        Returns:
+            Extracted text by URL, and extraction counts and throughput
+        """
+        budget_s = FullText.BUDGET_S if budget_s is None else budget_s
+        start = time.perf_counter()
+        deadline = time.monotonic() + budget_s
+        texts: Dict[str, str] = {}
+        failed = timed_out = 0
+
+        pool = ThreadPoolExecutor(max_workers=FullText.MAX_WORKERS)
+        pending = {pool.submit(self.fetch, url, deadline): url for url in dict.fromkeys(urls) if url}
+        try:
+            while pending:
+                remaining = budget_s - (time.perf_counter() - start)
+                if remaining <= 0:
+                    break
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = pending.pop(future)
+                    try:
+                        text = future.result()
+                    except TimeoutError:
+                        timed_out += 1
+                        continue
+                    if text:
+                        texts[url] = text
+                    else:
+                        failed += 1
+        finally:
+            # Requests already on the wire finish within TIMEOUT_S and still
+            # fill the cache; queued ones are cancelled or skip themselves
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        timed_out += len(pending)
+        report = {
+            "urls": len(texts) + failed + timed_out,
+            "extracted": len(texts),
+            "failed": failed,
+            "timed_out": timed_out,
+            "elapsed_s": round(elapsed, 3),
+            "articles_per_s": round((len(texts) + failed) / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+        print(f"Full-text enrichment: {report}")
+        return texts, report
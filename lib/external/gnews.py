@@ -1,16 +1,19 @@
 from datetime import datetime
-from typing import List, Any, Dict
+from typing import Any, Dict, Iterator
 import requests
 import logging
 from datetime import timezone
 import os
+from lib.infra.throttle import Throttle, GNEWS
 
 
 class GNews:
     API_KEY: str = ""
+    BASE_URL: str = "https://gnews.io/api/v4"
 
     def __init__(self):
-        pass
+        # Pooled so every tag's request reuses one TLS connection
+        self.session = requests.Session()
 
     @classmethod
     def init_app(cls, app: Any):
@@ -30,7 +33,12 @@ class GNews:
         else:
             print("LAMBDA DEBUG: GNews API key configured successfully")
 
-    def get_news(self, topic: str, from_date: datetime) -> List[Dict[str, Any]]:
+    def warm(self) -> None:
+        """Open the pooled connection before the first search"""
+        self.session.head(GNews.BASE_URL, timeout=5)
+
+    def get_news(self, topic: str, from_date: datetime) -> Iterator[Dict[str, Any]]:
+        """Yield the raw GNews article objects for a topic that carry content"""
         print(f"LAMBDA DEBUG: Fetching news for topic: {topic}")
         if not GNews.API_KEY:
             print("LAMBDA DEBUG: GNews API key not initialized")
@@ -41,44 +49,15 @@ class GNews:
             from_date_str = from_date.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
             print(f"LAMBDA DEBUG: Fetching news from date: {from_date_str}")
             
-            response = requests.get(
-                f"https://gnews.io/api/v4/search?q={topic}&from={from_date_str}&lang=en&country=us&max=10&apikey={GNews.API_KEY}"
-            )
-            response.raise_for_status()
-            
-            news_list = []
-            res = response.json()
-            
-            if "articles" not in res:
-                print(f"No articles found for topic: {topic}")
-                return []
-                
-            print(f"LAMBDA DEBUG: Found {len(res['articles'])} articles for topic: {topic}")
-                
-            # Process articles directly from GNews API response
-            for article in res["articles"]:
-                try:
-                    # Create a simplified article structure
-                    processed_article = {
-                        "title": article.get("title", ""),
-                        "description": article.get("description", ""),
-                        "content": article.get("content", ""),
-                        "maintext": article.get("content", ""),  # Use content as maintext
-                        "url": article.get("url", ""),
-                        "source": article.get("source", {}).get("name", ""),
-                        "date_publish": article.get("publishedAt", "")
-                    }
-                    
-                    # Only include articles with content
-                    if processed_article["maintext"]:
-                        news_list.append(processed_article)
-                    
-                except Exception as e:
-                    print(f"Error processing article: {e}")
-                    continue
+            def search() -> requests.Response:
+                response = self.session.get(
+                    f"{GNews.BASE_URL}/search?q={topic}&from={from_date_str}&lang=en&country=us&max=10&apikey={GNews.API_KEY}"
+                )
+                # Raised inside the call so a 429 is retried after its Retry-After
+                response.raise_for_status()
+                return response
 
-            print(f"LAMBDA DEBUG: Successfully processed {len(news_list)} articles")
-            return news_list
+            res = Throttle.call(GNEWS, search).json()
             
         except requests.RequestException as e:
             print(f"Error fetching news from GNews API: {e}")
@@ -86,3 +65,15 @@ class GNews:
         except Exception as e:
             print(f"Unexpected error in get_news: {e}")
             raise
+
+        if "articles" not in res:
+            print(f"No articles found for topic: {topic}")
+            return
+            
+        print(f"LAMBDA DEBUG: Found {len(res['articles'])} articles for topic: {topic}")
+
+        # Hand the API objects on as-is; callers build their own records
+        for article in res["articles"]:
+            # Only include articles with content
+            if article.get("content"):
+                yield article
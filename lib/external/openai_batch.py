@@ -0,0 +1,135 @@
+import json
+import os
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+from lib.infra.throttle import Throttle, OPENAI
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Batch states after which a batch will never produce more output
+TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+def parse_batch_output(data: bytes) -> Dict[str, Optional[str]]:
+    """
+    Map each custom_id in an OpenAI Batch output file to its message content
+
+    Requests that errored map to None.
+    """
+    results: Dict[str, Optional[str]] = {}
+    for line in data.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get("response") or {}
+        content = None
+        if not entry.get("error") and response.get("status_code") == 200:
+            choices = response.get("body", {}).get("choices") or []
+            if choices:
+                content = choices[0].get("message", {}).get("content")
+        results[entry["custom_id"]] = content
+    return results
+
+
+class BatchSubmitter(ABC):
+    """Submits an OpenAI Batch JSONL file and fetches its output"""
+
+    @abstractmethod
+    def submit(self, data: bytes) -> str:
+        """Submit a batch input file and return the batch id"""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Return the OpenAI batch status, e.g. in_progress or completed"""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> bytes:
+        """Return the batch output file of a completed batch"""
+
+
+class OpenAIBatchSubmitter(BatchSubmitter):
+    def __init__(self, api_key: str):
+        from openai import OpenAI as OpenAIClient
+        # Throttle owns retries, as for the chat and embeddings clients
+        self.client = OpenAIClient(api_key=api_key, max_retries=0)
+
+    def submit(self, data: bytes) -> str:
+        # A create that timed out may still have gone through, and a second
+        # batch would be billed again, so only rate limits are retried
+        input_file = Throttle.call(OPENAI, lambda: self.client.files.create(
+            file=("summaries.jsonl", data), purpose="batch"), retry_transient=False)
+        batch = Throttle.call(OPENAI, lambda: self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h"
+        ), retry_transient=False)
+        print(f"Submitted OpenAI batch {batch.id} (input file {input_file.id})")
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return Throttle.call(OPENAI, lambda: self.client.batches.retrieve(batch_id)).status
+
+    def results(self, batch_id: str) -> bytes:
+        batch = Throttle.call(OPENAI, lambda: self.client.batches.retrieve(batch_id))
+        if not batch.output_file_id:
+            return b""
+        return Throttle.call(OPENAI, lambda: self.client.files.content(batch.output_file_id)).content
+
+
+class LocalBatchSubmitter(BatchSubmitter):
+    """
+    File-based stand-in for the Batch API
+
+    Input files are written to `<directory>/<batch_id>.input.jsonl`. A batch is
+    completed once `<batch_id>.output.jsonl` exists, either written by hand or
+    produced at submit time by `responder`, which maps a request body to the
+    message content.
+    """
+
+    def __init__(self, directory: str, responder: Optional[Callable[[Dict[str, Any]], str]] = None):
+        self.directory = directory
+        self.responder = responder
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, batch_id: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.{kind}.jsonl")
+
+    def submit(self, data: bytes) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex}"
+        with open(self._path(batch_id, "input"), "wb") as f:
+            f.write(data)
+
+        if self.responder is not None:
+            lines: List[str] = []
+            for line in data.decode("utf-8").splitlines():
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                lines.append(json.dumps({
+                    "id": f"req_{uuid.uuid4().hex}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {
+                            "role": "assistant",
+                            "content": self.responder(request["body"])
+                        }}]}
+                    },
+                    "error": None
+                }))
+            with open(self._path(batch_id, "output"), "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+        print(f"Wrote local batch {batch_id} to {self.directory}")
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        if os.path.exists(self._path(batch_id, "output")):
+            return "completed"
+        return "in_progress"
+
+    def results(self, batch_id: str) -> bytes:
+        with open(self._path(batch_id, "output"), "rb") as f:
+            return f.read()
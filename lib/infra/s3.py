@@ -1,13 +1,22 @@
 import json
 import tempfile
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
 import os
 import logging
 from typing import Any, List, Dict, Optional
 from io import BytesIO
+from lib.infra.throttle import Throttle, S3 as S3_SERVICE
 
 # logging.basicConfig(level=print)
 
+# Throttle.call owns retries, so botocore and s3transfer make one attempt
+# each instead of multiplying its attempts by their own
+BOTO_CONFIG = Config(retries={"total_max_attempts": 1})
+TRANSFER_CONFIG = TransferConfig(num_download_attempts=1)
+
 
 class File:
     def __init__(self, filename: str):
@@ -33,7 +42,7 @@ class S3:
                 # Update class variable for future use
                 S3.AWS_REGION = region
                 print(f"Using AWS_REGION from environment: {region}")
-            self._resource = boto3.resource('s3', region_name=S3.AWS_REGION)
+            self._resource = boto3.resource('s3', region_name=S3.AWS_REGION, config=BOTO_CONFIG)
         return self._resource
         
     @property
@@ -47,7 +56,7 @@ class S3:
                 # Update class variable for future use
                 S3.AWS_REGION = region
                 print(f"Using AWS_REGION from environment: {region}")
-            self._client = boto3.client('s3', region_name=S3.AWS_REGION)
+            self._client = boto3.client('s3', region_name=S3.AWS_REGION, config=BOTO_CONFIG)
         return self._client
         
     @property
@@ -82,37 +91,77 @@ class S3:
             else:
                 print("AWS_BUCKET_NAME not configured")
 
+    def warm(self) -> None:
+        """Open a pooled connection to the bucket before the first request"""
+        self.client.head_bucket(Bucket=self.bucket)
+
     @staticmethod
     def deserialize_json(json_obj: Dict) -> BytesIO:
         file_content = json.dumps(json_obj).encode("utf-8")
         deserialized = BytesIO(file_content)
         return deserialized
 
+    def _download_bytes(self, bucket: str, key: str) -> bytes:
+        def download() -> bytes:
+            # A fresh buffer per attempt so a retried download doesn't append
+            file_obj = BytesIO()
+            self.client.download_fileobj(bucket, key, file_obj, Config=TRANSFER_CONFIG)
+            return file_obj.getvalue()
+
+        return Throttle.call(S3_SERVICE, download)
+
     def serialize_json_files(self, file_keys: List[str], bucket: Optional[str] = None) -> Optional[List[Dict]]:
         if bucket is None:
             bucket = self.bucket
         try:
             res = []
             for file_key in file_keys:
-                file_obj = BytesIO()
-                self.client.download_fileobj(bucket, file_key, file_obj)
-                file_obj.seek(0)
-                json_data = json.load(file_obj)
+                json_data = json.loads(self._download_bytes(bucket, file_key))
                 res.append(json_data)
             return res
         except Exception as e:
             print(f"Error serializing JSON files: {e}")
             return None
 
+    def get_file_object(self, path: str, bucket: Optional[str] = None) -> Optional[bytes]:
+        if bucket is None:
+            bucket = self.bucket
+        try:
+            return self._download_bytes(bucket, path)
+        except Exception as e:
+            print(
+                f"Failed downloading file object from S3 ({bucket}/{path}): {e}")
+            return None
+
+    def find_file_object(self, path: str, bucket: Optional[str] = None) -> Optional[bytes]:
+        """
+        The object's contents, or None if there is no such key
+
+        Unlike get_file_object, any other failure raises, so a caller can
+        tell a missing object from one it failed to read.
+        """
+        if bucket is None:
+            bucket = self.bucket
+        try:
+            return self._download_bytes(bucket, path)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
+            raise
+
+    def list_files(self, dir_name: str, bucket: Optional[str] = None) -> List[str]:
+        """Keys under `dir_name`; unlike get_files_from_dir, a failed listing raises"""
+        if bucket is None:
+            bucket = self.bucket
+        response = Throttle.call(S3_SERVICE, lambda: self.client.list_objects_v2(
+            Bucket=bucket, Prefix=dir_name))
+        return [obj['Key'] for obj in response.get('Contents', [])]
+
     def get_files_from_dir(self, dir_name: str, bucket: Optional[str] = None) -> List[str]:
         if bucket is None:
             bucket = self.bucket
         try:
-            response = self.client.list_objects_v2(
-                Bucket=bucket, Prefix=dir_name)
-            if 'Contents' in response:
-                return [obj['Key'] for obj in response['Contents']]
-            return []
+            return self.list_files(dir_name, bucket)
         except Exception as e:
             print(
                 f"Error listing files in {bucket}/{dir_name}: {e}")
@@ -125,7 +174,8 @@ class S3:
         local_path = os.path.join(
             tempfile.gettempdir(), os.path.basename(path))
         try:
-            self.client.download_file(bucket, path, local_path)
+            Throttle.call(S3_SERVICE, lambda: self.client.download_file(
+                bucket, path, local_path, Config=TRANSFER_CONFIG))
             print(
                 f"Successfully downloaded file from S3: {path} → {local_path}")
             return local_path
@@ -147,7 +197,8 @@ class S3:
             # For debugging
             print(f"Uploading file from {file_local_path} to S3 path: {file_s3_path}")
             
-            self.client.upload_file(file_local_path, bucket, file_s3_path)
+            Throttle.call(S3_SERVICE, lambda: self.client.upload_file(
+                file_local_path, bucket, file_s3_path))
 
             object_url = f"https://{bucket}.s3.amazonaws.com/{file_s3_path}"
             print(
@@ -164,8 +215,12 @@ class S3:
         try:
             # Remove check for filename attribute as we always provide file_s3_path explicitly
             
-            file_obj.seek(0)
-            self.client.upload_fileobj(file_obj, bucket, file_s3_path)
+            def upload() -> None:
+                # Rewind on every attempt so a retry sends the whole object
+                file_obj.seek(0)
+                self.client.upload_fileobj(file_obj, bucket, file_s3_path)
+
+            Throttle.call(S3_SERVICE, upload)
 
             object_url = f"https://{bucket}.s3.amazonaws.com/{file_s3_path}"
             print(
@@ -180,7 +235,8 @@ class S3:
         if bucket is None:
             bucket = self.bucket
         try:
-            self.client.delete_object(Bucket=bucket, Key=file_s3_path)
+            Throttle.call(S3_SERVICE, lambda: self.client.delete_object(
+                Bucket=bucket, Key=file_s3_path))
             print(f"Removed file from S3: {file_s3_path}")
         except Exception as e:
             print(
@@ -189,7 +245,8 @@ class S3:
     def copy_s3_file(self, source_bucket: str, source_key: str, destination_bucket: str, destination_key: str) -> Optional[str]:
         try:
             copy_source = {'Bucket': source_bucket, 'Key': source_key}
-            self.client.copy(copy_source, destination_bucket, destination_key)
+            Throttle.call(S3_SERVICE, lambda: self.client.copy(
+                copy_source, destination_bucket, destination_key))
 
             s3_url = f"https://{destination_bucket}.s3.amazonaws.com/{destination_key}"
             print(
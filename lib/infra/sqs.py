@@ -0,0 +1,49 @@
+import json
+import os
+from typing import Any, Dict
+
+import boto3
+from botocore.config import Config
+
+from lib.infra.throttle import Throttle, SQS as SQS_SERVICE
+
+
+class SQS:
+    AWS_REGION: str = ''
+    QUEUE_URL: str = ''
+
+    def __init__(self):
+        self._client: Any = None
+
+    @classmethod
+    def init_app(cls, app: Any) -> None:
+        cls.AWS_REGION = app.config.get('AWS_REGION', '') or os.environ.get('AWS_REGION', '')
+        cls.QUEUE_URL = app.config.get('CONTINUATION_QUEUE_URL', '')
+        if not cls.QUEUE_URL:
+            print("CONTINUATION_QUEUE_URL not configured")
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            if not SQS.AWS_REGION:
+                raise ValueError("AWS_REGION not configured")
+            # Throttle.call owns retries, so botocore makes a single attempt
+            self._client = boto3.client('sqs', region_name=SQS.AWS_REGION,
+                                        config=Config(retries={"total_max_attempts": 1}))
+        return self._client
+
+    def send_event(self, event: Dict[str, Any]) -> bool:
+        """Enqueue an event for the Lambda's SQS trigger"""
+        if not SQS.QUEUE_URL:
+            print("Cannot enqueue event: CONTINUATION_QUEUE_URL not configured")
+            return False
+        try:
+            # A send that timed out may have been enqueued; a second copy
+            # would run the same work twice
+            Throttle.call(SQS_SERVICE, lambda: self.client.send_message(
+                QueueUrl=SQS.QUEUE_URL, MessageBody=json.dumps(event)), retry_transient=False)
+            print(f"Enqueued {event.get('detail', {}).get('eventType')} event to {SQS.QUEUE_URL}")
+            return True
+        except Exception as e:
+            print(f"Failed to enqueue event: {e}")
+            return False
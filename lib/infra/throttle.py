@@ -0,0 +1,309 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+OPENAI = "openai"
+EMBEDDINGS = "embeddings"
+GNEWS = "gnews"
+S3 = "s3"
+EXPRESS = "express"
+SQS = "sqs"
+
+SERVICES = (OPENAI, EMBEDDINGS, GNEWS, S3, EXPRESS, SQS)
+
+# Error codes AWS uses instead of a plain 429
+AWS_THROTTLE_CODES = ("SlowDown", "Throttling", "ThrottlingException",
+                      "TooManyRequestsException", "RequestLimitExceeded")
+
+# Errors where the request never got an answer, by class name so no client
+# library has to be imported here: requests, the OpenAI SDK, botocore
+CONNECTION_ERRORS = frozenset((
+    "ConnectionError", "Timeout", "APIConnectionError", "APITimeoutError",
+    "EndpointConnectionError", "ConnectionClosedError", "ReadTimeoutError", "ConnectTimeoutError",
+))
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Refills at `rate` per second up to `capacity`; reservations may go negative"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens and return how long to wait before using them"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Request-rate and token-rate buckets plus an adaptive concurrency limit
+    for one service
+
+    The concurrency limit halves on every rate-limit response and grows by
+    one after a full window of successes, and a Retry-After pauses every
+    caller, not just the one that got it.
+    """
+
+    def __init__(self, rps: float = 0, tpm: float = 0, max_concurrency: int = 16):
+        self.requests = TokenBucket(rps, max(rps, 1.0)) if rps else None
+        self.tokens = TokenBucket(tpm / 60.0, tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.in_flight = 0
+        self.successes = 0
+        self.paused_until = 0.0
+        self.condition = threading.Condition()
+
+        self.calls = 0
+        self.rate_limited = 0
+        self.throttled_s = 0.0
+
+    def scale(self, share: float) -> None:
+        """Keep only `share` of the rates, for one of several processes"""
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket.rate *= share
+                bucket.capacity = max(bucket.capacity * share, 1.0)
+                bucket.tokens = min(bucket.tokens, bucket.capacity)
+
+    def acquire(self, tokens: int = 0) -> None:
+        start = time.monotonic()
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    self.condition.wait(self.paused_until - now)
+                elif self.in_flight >= self.limit:
+                    self.condition.wait()
+                else:
+                    break
+            self.in_flight += 1
+
+        wait = 0.0
+        if self.requests is not None:
+            wait = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+
+        with self.condition:
+            self.calls += 1
+            self.throttled_s += time.monotonic() - start
+
+    def release(self) -> None:
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def on_success(self) -> None:
+        with self.condition:
+            self.successes += 1
+            if self.limit < self.max_concurrency and self.successes >= self.limit:
+                self.limit += 1
+                self.successes = 0
+                self.condition.notify_all()
+
+    def on_rate_limited(self, delay: float) -> None:
+        with self.condition:
+            self.rate_limited += 1
+            self.successes = 0
+            self.limit = max(1, self.limit // 2)
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.condition:
+            return {
+                "calls": self.calls,
+                "rate_limited": self.rate_limited,
+                "throttled_s": round(self.throttled_s, 3),
+                "concurrency": self.limit,
+            }
+
+
+def _response_info(error: Exception) -> Tuple[Optional[int], Optional[str], Any]:
+    """HTTP status, AWS error code and response headers carried by `error`"""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None)
+    code = None
+    headers: Any = {}
+
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code")
+        metadata = response.get("ResponseMetadata", {})
+        status = status or metadata.get("HTTPStatusCode")
+        headers = metadata.get("HTTPHeaders", {})
+    elif response is not None:
+        status = status or getattr(response, "status_code", None)
+        headers = getattr(response, "headers", None) or {}
+    return status, code, headers
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with jitter"""
+    return min(Throttle.BACKOFF_S * 2 ** attempt, 30.0) * (0.5 + random.random())
+
+
+def rate_limit_delay(error: Exception, attempt: int) -> Optional[float]:
+    """
+    Seconds to back off if `error` is a rate-limit response, else None
+
+    Understands requests/httpx responses (OpenAI SDK errors carry one) and
+    botocore ClientError throttling codes, and honours Retry-After.
+    """
+    status, code, headers = _response_info(error)
+    if status != 429 and code not in AWS_THROTTLE_CODES:
+        return None
+
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    # Exponential backoff with jitter when the server gives no hint
+    return _backoff(attempt)
+
+
+def transient_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to back off if `error` is a 5xx response or a connection failure, else None"""
+    status, _, _ = _response_info(error)
+    if isinstance(status, int) and status >= 500:
+        return _backoff(attempt)
+    if any(cls.__name__ in CONNECTION_ERRORS for cls in type(error).__mro__):
+        return _backoff(attempt)
+    return None
+
+
+class Throttle:
+    """
+    Process-wide limits on calls to each external service
+
+    `call` runs a request through the service's rate limiter and retries it
+    on rate-limit responses, 5xx responses and connection failures. The bulk runner additionally installs
+    process-shared semaphores with `configure` so in-flight calls are capped
+    across all of its workers.
+    """
+    MAX_RETRIES: int = 5
+    BACKOFF_S: float = 1.0
+
+    _semaphores: Dict[str, Any] = {}
+    _limiters: Dict[str, RateLimiter] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def init_app(cls, app: Any) -> None:
+        max_concurrency = int(app.config.get("THROTTLE_MAX_CONCURRENCY", 16) or 16)
+        limits = {
+            OPENAI: (app.config.get("OPENAI_RPS", 0), app.config.get("OPENAI_TPM", 0)),
+            EMBEDDINGS: (app.config.get("EMBEDDINGS_RPS", 0), app.config.get("EMBEDDINGS_TPM", 0)),
+            GNEWS: (app.config.get("GNEWS_RPS", 0), 0),
+            S3: (app.config.get("S3_RPS", 0), 0),
+        }
+        with cls._lock:
+            cls._limiters = {
+                service: RateLimiter(float(rps or 0), float(tpm or 0), max_concurrency)
+                for service, (rps, tpm) in limits.items()
+            }
+        print(f"Throttle limits (rps, tpm): {limits}, max concurrency {max_concurrency}")
+
+    @classmethod
+    def configure(cls, semaphores: Dict[str, Any]) -> None:
+        cls._semaphores = dict(semaphores)
+
+    @classmethod
+    def scale(cls, share: float) -> None:
+        for limiter in cls._limiters.values():
+            limiter.scale(share)
+
+    @classmethod
+    def limiter(cls, service: str) -> RateLimiter:
+        with cls._lock:
+            if service not in cls._limiters:
+                cls._limiters[service] = RateLimiter()
+            return cls._limiters[service]
+
+    @classmethod
+    @contextmanager
+    def slot(cls, service: str) -> Iterator[None]:
+        semaphore = cls._semaphores.get(service)
+        if semaphore is None:
+            yield
+            return
+
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    @classmethod
+    def call(cls, service: str, fn: Callable[[], T], tokens: int = 0, retry_transient: bool = True) -> T:
+        """
+        Run `fn` under the service's limits, retrying rate-limited attempts
+
+        5xx responses and connection failures are retried with the same
+        backoff, but only delay this caller: they say nothing about the
+        service's rate limit.
+
+        Args:
+            service: One of SERVICES
+            fn: The request; must be safe to repeat
+            tokens: Estimated tokens the request uses, for tokens-per-minute limits
+            retry_transient: Also retry 5xx responses and connection failures;
+                off for requests that may have taken effect before failing
+        """
+        limiter = cls.limiter(service)
+        attempt = 0
+        backoff = None
+        while True:
+            if backoff is not None:
+                # Outside the slot and the in-flight count, so other callers
+                # keep going meanwhile
+                time.sleep(backoff)
+                backoff = None
+            with cls.slot(service):
+                limiter.acquire(tokens)
+                try:
+                    result = fn()
+                except Exception as e:
+                    if attempt >= cls.MAX_RETRIES:
+                        raise
+                    delay = rate_limit_delay(e, attempt)
+                    if delay is not None:
+                        limiter.on_rate_limited(delay)
+                        print(f"{service} rate limited, retrying in {delay:.1f}s "
+                              f"(attempt {attempt + 1}/{cls.MAX_RETRIES})")
+                    else:
+                        backoff = transient_delay(e, attempt) if retry_transient else None
+                        if backoff is None:
+                            raise
+                        print(f"{service} request failed ({e}), retrying in {backoff:.1f}s "
+                              f"(attempt {attempt + 1}/{cls.MAX_RETRIES})")
+                    attempt += 1
+                    continue
+                finally:
+                    limiter.release()
+            limiter.on_success()
+            return result
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, Any]]:
+        with cls._lock:
+            limiters = dict(cls._limiters)
+        return {service: limiter.stats() for service, limiter in limiters.items()}
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic local embedder for offline evaluation
+
+    Word unigrams and character trigrams are hashed into a fixed number of
+    signed buckets and the result is L2-normalized, so near-identical texts
+    land close together without any network call.
+    """
+
+    def __init__(self, size: int = 1024):
+        self.size = size
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        joined = " ".join(words)
+        return words + [joined[i:i + 3] for i in range(max(len(joined) - 2, 0))]
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.size, dtype="float32")
+        for feature in self._features(text):
+            digest = hashlib.md5(feature.encode("utf-8")).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.size
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedder with a JSON file cache keyed by the text's SHA-1
+
+    Lets an evaluation run against real embeddings once and then replay
+    them for free.
+    """
+
+    def __init__(self, embeddings: Embeddings, path: str):
+        self.embeddings = embeddings
+        self.path = path
+        self.cache: Dict[str, List[float]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.cache = json.load(f)
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        missing = [text for text in texts if self._key(text) not in self.cache]
+        if missing:
+            for text, vector in zip(missing, self.embeddings.embed_documents(missing)):
+                self.cache[self._key(text)] = vector
+        return [self.cache[self._key(text)] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def save(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f)
@@ -1,22 +1,36 @@
 import json
 import os
 import logging
-from typing import List, Optional, Any
+from typing import Any, Dict, List, Optional
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain_community.embeddings import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain.docstore.document import Document
 from langchain.schema import BaseMessage
 
-import numpy as np
-from io import BytesIO
-
 from pydantic import SecretStr
 
+from lib.external.openai_batch import BATCH_ENDPOINT
+from lib.infra.throttle import Throttle, EMBEDDINGS, OPENAI
+from lib.langchain.vectorstore import (
+    FLAT, STORAGE_MODES, build_index, deserialize_vector_db, nearest_similarity, serialize_vector_db)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for tokens-per-minute budgeting (~4 chars a token)"""
+    return len(text) // 4 + 1
+
 
 class OpenAI:
     API_KEY: str = ""
+    # 0 keeps the model's native 3072 dimensions
+    EMBEDDING_DIMENSIONS: int = 0
+    VECTOR_STORE_MODE: str = FLAT
+    # Cosine similarity at which an article counts as already seen; see
+    # benchmarks/dedup_eval.py for how to measure a value
+    DUPLICATE_THRESHOLD: float = 0.85
+    # Tokens reserved for each completion when budgeting OPENAI_TPM
+    COMPLETION_TOKENS: int = 1000
 
     def __init__(self):
         print("LAMBDA DEBUG: Initializing OpenAI instance")
@@ -28,13 +42,21 @@ class OpenAI:
         self.llm = ChatOpenAI(
             api_key=SecretStr(OpenAI.API_KEY),
             model="gpt-4-turbo-preview",
-            temperature=0.7
+            temperature=0.7,
+            # Throttle owns retries (429s, 5xx and connection errors) so 429s
+            # also shrink the shared concurrency
+            max_retries=0
         )
         
         print("LAMBDA DEBUG: Creating OpenAIEmbeddings instance")
+        model_kwargs = {}
+        if OpenAI.EMBEDDING_DIMENSIONS:
+            model_kwargs["dimensions"] = OpenAI.EMBEDDING_DIMENSIONS
         self.embeddings = OpenAIEmbeddings(
             api_key=OpenAI.API_KEY,
-            model="text-embedding-3-large"
+            model="text-embedding-3-large",
+            model_kwargs=model_kwargs,
+            max_retries=0
         )
         print("LAMBDA DEBUG: OpenAI instance initialized successfully")
 
@@ -57,9 +79,31 @@ class OpenAI:
         else:
             print("LAMBDA DEBUG: OpenAI API key configured successfully from config")
 
+        cls.EMBEDDING_DIMENSIONS = int(app.config.get("EMBEDDING_DIMENSIONS", 0) or 0)
+        cls.VECTOR_STORE_MODE = app.config.get("VECTOR_STORE_MODE", FLAT) or FLAT
+        if cls.VECTOR_STORE_MODE not in STORAGE_MODES:
+            print(f"LAMBDA DEBUG: Unknown VECTOR_STORE_MODE {cls.VECTOR_STORE_MODE}, using {FLAT}")
+            cls.VECTOR_STORE_MODE = FLAT
+        cls.DUPLICATE_THRESHOLD = float(app.config.get("DUPLICATE_THRESHOLD", 0.85) or 0.85)
+        print(f"LAMBDA DEBUG: Vector store mode {cls.VECTOR_STORE_MODE}, "
+              f"embedding dimensions {cls.EMBEDDING_DIMENSIONS or 'native'}, "
+              f"duplicate threshold {cls.DUPLICATE_THRESHOLD}")
+
+    def warm(self) -> None:
+        """
+        Open the chat and embeddings clients' connections with a free model
+        lookup each
+        """
+        # Short timeouts: this may run in the Lambda init phase
+        self.llm.root_client.models.retrieve(self.llm.model_name, timeout=5)
+        # The embeddings resource has its own root client and connection pool
+        self.embeddings.client._client.models.retrieve(self.embeddings.model, timeout=5)
+
     def send_request(self, messages: List[BaseMessage]) -> str:
         try:
-            res = self.llm.invoke(messages)
+            tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+            res = Throttle.call(OPENAI, lambda: self.llm.invoke(messages),
+                                tokens=tokens + OpenAI.COMPLETION_TOKENS)
             if isinstance(res.content, str):
                 return res.content
             raise ValueError("Unexpected response format from OpenAI")
@@ -116,44 +160,67 @@ class OpenAI:
             print(f"Data causing error: {str(data)[:100]}...")  # Log first 100 chars
             raise
 
-    def is_duplicate(self, vector_db: FAISS, content: str, threshold: float = 0.85) -> bool:
+    def to_batch_request(self, custom_id: str, messages: List[BaseMessage]) -> dict:
+        """Build one OpenAI Batch API line for the same call `send_request` makes"""
+        roles = {"system": "system", "ai": "assistant", "human": "user"}
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": self.llm.model_name,
+                "temperature": self.llm.temperature,
+                "messages": [{"role": roles.get(message.type, message.type),
+                              "content": message.content} for message in messages]
+            }
+        }
+
+    def is_duplicate(self, vector_db: FAISS, content: str, threshold: Optional[float] = None) -> bool:
+        if threshold is None:
+            threshold = OpenAI.DUPLICATE_THRESHOLD
         try:
-            query_embedding = self.embeddings.embed_query(content)
-            similar_docs = vector_db.similarity_search_by_vector(
-                query_embedding, k=1)
-
-            if similar_docs:
-                existing_doc = similar_docs[0].page_content
-                existing_embedding = self.embeddings.embed_query(existing_doc)
-                similarity_score = self._calculate_cosine_similarity(
-                    np.array(query_embedding), np.array(existing_embedding))
-                if similarity_score >= threshold:
-                    self.update_vector_db(vector_db, content)
-                    return True
+            query_embedding = Throttle.call(
+                EMBEDDINGS, lambda: self.embeddings.embed_query(content),
+                tokens=estimate_tokens(content))
+
+            similarity_score = nearest_similarity(vector_db, query_embedding)
+            if similarity_score is not None and similarity_score >= threshold:
+                return True
+            # Remember the new article so later copies match it, reusing the
+            # query embedding rather than embedding the text a second time
+            vector_db.add_embeddings([(content, query_embedding)])
             return False
         except Exception as e:
             print(f"Error checking for duplicates: {e}")
             raise
 
-    def load_vector_db(self, path: str) -> Optional[FAISS]:
+    def load_vector_db(self, objects: Dict[str, bytes]) -> Optional[FAISS]:
         try:
-            return FAISS.load_local(path, self.embeddings, allow_dangerous_deserialization=True)
+            db = deserialize_vector_db(objects, self.embeddings)
         except Exception as e:
-            print(f"Error loading vector DB from {path}: {e}")
+            print(f"Error loading vector DB: {e}")
             raise
 
+        if OpenAI.EMBEDDING_DIMENSIONS and db.index.d != OpenAI.EMBEDDING_DIMENSIONS:
+            # Vectors of another size can't be compared, so start a new store
+            print(f"Vector DB has {db.index.d} dimensions, "
+                  f"expected {OpenAI.EMBEDDING_DIMENSIONS}; ignoring it")
+            return None
+        return db
+
     def create_vector_db(self) -> FAISS:
         try:
             # Get embedding dimension by creating a sample embedding
             sample_text = "This is a sample text to determine embedding dimension"
-            sample_embedding = self.embeddings.embed_query(sample_text)
+            sample_embedding = Throttle.call(
+                EMBEDDINGS, lambda: self.embeddings.embed_query(sample_text),
+                tokens=estimate_tokens(sample_text))
             dimension = len(sample_embedding)
             
             # Create an empty FAISS index with the correct dimension
-            import faiss
             from langchain_community.docstore.in_memory import InMemoryDocstore
             
-            index = faiss.IndexFlatL2(dimension)
+            index = build_index(dimension, OpenAI.VECTOR_STORE_MODE)
             
             # Initialize with empty docstore and index_to_docstore_id
             return FAISS(
@@ -161,32 +228,16 @@ class OpenAI:
                 index=index,
                 docstore=InMemoryDocstore({}),
                 index_to_docstore_id={},
+                # Similarity is read off L2 distances, which needs unit vectors
+                normalize_L2=True,
             )
         except Exception as e:
             print(f"Error creating vector DB: {e}")
             raise
 
-    def update_vector_db(self, vector_db: FAISS, content: str) -> None:
-        try:
-            document = Document(page_content=content)
-            vector_db.add_documents([document])
-        except Exception as e:
-            print(f"Error updating vector DB: {e}")
-            raise
-
-    def save_vector_db_local(self, vector_db: FAISS, name: str) -> str:
-        try:
-            path = os.path.join("/tmp", name)
-            vector_db.save_local(path)
-            return path
-        except Exception as e:
-            print(f"Error saving vector DB to {name}: {e}")
-            raise
-
-    @staticmethod
-    def _calculate_cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
+    def dump_vector_db(self, vector_db: FAISS) -> Dict[str, bytes]:
         try:
-            return float(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
+            return serialize_vector_db(vector_db)
         except Exception as e:
-            print(f"Error calculating cosine similarity: {e}")
+            print(f"Error serializing vector DB: {e}")
             raise
@@ -0,0 +1,87 @@
+import hashlib
+import re
+from typing import Any, List, Optional
+
+import numpy as np
+
+# Stored next to the vector DB objects in the provider's vectordb/ prefix
+SIMHASH_FILE = "simhash.bin"
+
+
+def simhash(text: str, shingle: int = 3) -> int:
+    """
+    64-bit SimHash of a text's word shingles
+
+    Texts that share most of their shingles, like wire copies with a
+    different byline or a trimmed last sentence, land a few bits apart.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < shingle:
+        features = [" ".join(words)]
+    else:
+        features = [" ".join(words[i:i + shingle]) for i in range(len(words) - shingle + 1)]
+
+    weights = np.zeros(64, dtype=np.int32)
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        bits = np.unpackbits(np.frombuffer(digest, dtype=np.uint8))
+        weights += 2 * bits.astype(np.int32) - 1
+
+    signature = np.packbits(weights > 0)
+    return int.from_bytes(signature.tobytes(), "big")
+
+
+class SimHashIndex:
+    """
+    The SimHash signatures of every article a provider has seen
+
+    A signature within MAX_DISTANCE bits of a stored one is a near-exact
+    copy and can be settled without an embedding call. Anything further
+    away is only lexically different, which says nothing about whether it
+    is the same story, so it still goes to the embedding check.
+    """
+    # Reposts of a snippet differ by a handful of bits while unrelated texts
+    # sit around 32; at 8 a false match is a ~1e-10 chance per stored
+    # signature. benchmarks/dedup_eval.py prints the trade-off for a corpus
+    MAX_DISTANCE: int = 8
+
+    def __init__(self, signatures: Optional[np.ndarray] = None):
+        self._stored = signatures if signatures is not None else np.zeros(0, dtype=np.uint64)
+        self._added: List[int] = []
+
+    @classmethod
+    def init_app(cls, app: Any) -> None:
+        cls.MAX_DISTANCE = int(app.config.get("SIMHASH_MAX_DISTANCE", 8))
+        print(f"SimHash prefilter max distance {cls.MAX_DISTANCE} bits")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SimHashIndex":
+        return cls(np.frombuffer(data, dtype="<u8").astype(np.uint64))
+
+    def to_bytes(self) -> bytes:
+        return self._signatures().astype("<u8").tobytes()
+
+    def _signatures(self) -> np.ndarray:
+        if self._added:
+            self._stored = np.concatenate([self._stored, np.array(self._added, dtype=np.uint64)])
+            self._added = []
+        return self._stored
+
+    def __len__(self) -> int:
+        return len(self._stored) + len(self._added)
+
+    def nearest_distance(self, signature: int) -> Optional[int]:
+        """Hamming distance to the closest stored signature, None if empty"""
+        stored = self._signatures()
+        if not len(stored):
+            return None
+        xor = np.bitwise_xor(stored, np.uint64(signature))
+        distances = np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+        return int(distances.min())
+
+    def is_near_duplicate(self, signature: int) -> bool:
+        distance = self.nearest_distance(signature)
+        return distance is not None and distance <= SimHashIndex.MAX_DISTANCE
+
+    def add(self, signature: int) -> None:
+        self._added.append(signature)
@@ -0,0 +1,186 @@
+import gzip
+import json
+import pickle
+import time
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+from langchain.docstore.document import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+# Storage modes for the provider vector stores, smallest last
+FLAT = "flat"  # exact float32 vectors
+FP16 = "fp16"  # scalar quantized to float16, half the size of flat
+SQ8 = "sq8"  # scalar quantized to one byte per component, a quarter of flat
+
+STORAGE_MODES = (FLAT, FP16, SQ8)
+
+# Width of the sq8 range in standard deviations; see benchmarks/vector_store_recall.py
+SQ8_SIGMAS = 6.0
+
+# Object names of a stored vector DB. The index bytes are the same format
+# FAISS.save_local writes; the docstore used to be a pickle (index.pkl)
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.json.gz"
+LEGACY_DOCSTORE_FILE = "index.pkl"
+
+
+def sq8_range(dimension: int) -> float:
+    """Bound of the 8-bit quantizer range: six standard deviations of a unit vector's components"""
+    return min(1.0, SQ8_SIGMAS / float(np.sqrt(dimension)))
+
+
+def build_index(dimension: int, mode: str = FLAT) -> Any:
+    """
+    Create an empty L2 index for unit-length embeddings
+
+    The quantized modes need no training data, so a provider store can
+    start empty and grow one article at a time like the flat one.
+    """
+    if mode == FLAT:
+        return faiss.IndexFlatL2(dimension)
+
+    if mode == FP16:
+        return faiss.IndexScalarQuantizer(
+            dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+
+    if mode == SQ8:
+        index = faiss.IndexScalarQuantizer(
+            dimension, faiss.ScalarQuantizer.QT_8bit_uniform, faiss.METRIC_L2)
+        # Training on the two corners fixes the range without needing any
+        # real embeddings. Components of a unit vector are ~1/sqrt(d), so
+        # [-1, 1] would leave most of the 256 levels unused; the encoder
+        # clamps the rare component outside the range
+        limit = sq8_range(dimension)
+        corners = np.stack([np.full(dimension, -limit), np.full(dimension, limit)])
+        index.train(corners.astype("float32"))
+        return index
+
+    raise ValueError(f"Unknown vector store mode: {mode}")
+
+
+def serialize_vector_db(vector_db: FAISS) -> Dict[str, bytes]:
+    """
+    Encode a vector DB as in-memory objects, keyed by object name
+
+    The docstore is written as gzipped JSON columns in index order, which
+    also makes the position -> document id mapping implicit.
+    """
+    ids = [vector_db.index_to_docstore_id[i] for i in range(vector_db.index.ntotal)]
+    docs = [vector_db.docstore.search(doc_id) for doc_id in ids]
+    columns = {
+        "ids": ids,
+        "texts": [doc.page_content for doc in docs],
+        "metadata": [doc.metadata for doc in docs],
+    }
+    return {
+        INDEX_FILE: faiss.serialize_index(vector_db.index).tobytes(),
+        DOCSTORE_FILE: gzip.compress(json.dumps(columns, ensure_ascii=False).encode("utf-8")),
+    }
+
+
+def deserialize_vector_db(objects: Dict[str, bytes], embeddings: Any) -> FAISS:
+    """Rebuild a vector DB from the objects `serialize_vector_db` produced"""
+    index = faiss.deserialize_index(np.frombuffer(objects[INDEX_FILE], dtype="uint8"))
+
+    if DOCSTORE_FILE in objects:
+        columns = json.loads(gzip.decompress(objects[DOCSTORE_FILE]))
+        docstore = InMemoryDocstore({
+            doc_id: Document(page_content=text, metadata=metadata)
+            for doc_id, text, metadata in zip(columns["ids"], columns["texts"], columns["metadata"])
+        })
+        index_to_docstore_id = dict(enumerate(columns["ids"]))
+    else:
+        # Stores saved with FAISS.save_local; rewritten on the next save
+        docstore, index_to_docstore_id = pickle.loads(objects[LEGACY_DOCSTORE_FILE])
+
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id,
+        normalize_L2=True,
+    )
+
+
+def nearest_similarity(vector_db: FAISS, embedding: List[float]) -> Optional[float]:
+    """
+    Cosine similarity between an embedding and its nearest stored neighbour
+
+    OpenAI embeddings are unit length, so the squared L2 distance the index
+    returns is 2 - 2 * cos and the stored vector never has to be re-embedded.
+    """
+    if vector_db.index.ntotal == 0:
+        return None
+
+    query = np.asarray([embedding], dtype="float32")
+    faiss.normalize_L2(query)
+    distances, _ = vector_db.index.search(query, 1)
+    return 1.0 - float(distances[0][0]) / 2.0
+
+
+def reduce_dimensions(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """
+    Truncate and re-normalize full-size embeddings
+
+    This matches what text-embedding-3 returns for a `dimensions` request,
+    so existing full-size vectors can be used to measure a reduced size.
+    """
+    reduced = np.ascontiguousarray(vectors[:, :dimensions], dtype="float32")
+    faiss.normalize_L2(reduced)
+    return reduced
+
+
+def recall_check(vectors: np.ndarray, queries: np.ndarray, mode: str,
+                 threshold: float, dimensions: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compare duplicate decisions of a storage mode against the exact index
+
+    Args:
+        vectors: Stored full-size embeddings, one row per article
+        queries: Incoming full-size embeddings checked against the stored ones
+        mode: Storage mode to measure
+        threshold: Cosine similarity at which an article counts as a duplicate
+        dimensions: Reduced embedding size to measure alongside the mode
+
+    Returns:
+        Recall and precision of the mode's duplicate decisions relative to
+        the exact index, plus index size and load time
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    queries = np.ascontiguousarray(queries, dtype="float32")
+    faiss.normalize_L2(vectors)
+    faiss.normalize_L2(queries)
+
+    candidates = {"exact": (FLAT, vectors, queries)}
+    if dimensions:
+        candidates["candidate"] = (mode, reduce_dimensions(vectors, dimensions),
+                                   reduce_dimensions(queries, dimensions))
+    else:
+        candidates["candidate"] = (mode, vectors, queries)
+
+    decisions = {}
+    stats: Dict[str, Any] = {"mode": mode, "dimensions": dimensions or vectors.shape[1],
+                             "vectors": len(vectors), "threshold": threshold}
+    for name, (index_mode, stored, incoming) in candidates.items():
+        index = build_index(stored.shape[1], index_mode)
+        index.add(stored)
+        blob = faiss.serialize_index(index)
+
+        start = time.perf_counter()
+        index = faiss.deserialize_index(blob)
+        load_s = time.perf_counter() - start
+
+        distances, _ = index.search(incoming, 1)
+        decisions[name] = (1.0 - distances[:, 0] / 2.0) >= threshold
+        stats[f"{name}_bytes"] = int(blob.nbytes)
+        stats[f"{name}_load_ms"] = round(load_s * 1000, 3)
+
+    exact, candidate = decisions["exact"], decisions["candidate"]
+    agreed = int(np.sum(exact & candidate))
+    stats["exact_duplicates"] = int(np.sum(exact))
+    stats["recall"] = agreed / max(int(np.sum(exact)), 1)
+    stats["precision"] = agreed / max(int(np.sum(candidate)), 1)
+    return stats
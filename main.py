@@ -13,6 +13,12 @@ if dotenv_path.exists():
 else:
     print(f"Environment file not found at {dotenv_path}")
 
+# Available when the function runs with SnapStart
+try:
+    from snapshot_restore_py import register_after_restore
+except ImportError:
+    register_after_restore = None
+
 # Configure logging
 # logging.basicConfig(
 #     level=print,
@@ -35,8 +41,28 @@ def get_app():
         raise
 
 
-# Initialize application lazily when needed
+def prime_app():
+    """
+    Build the app during the init phase so the first event doesn't
+
+    Under SnapStart the snapshot is taken after init and connections don't
+    survive a restore, so those are opened in an after-restore hook instead.
+    """
+    app = get_app()
+    snap_start = os.environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") == "snap-start"
+    if snap_start and register_after_restore is not None:
+        app.prime(connect=False)
+        register_after_restore(app.prime)
+    else:
+        app.prime()
+    return app
+
+
+# Initialized at module load unless PRIME_ON_INIT is off, in which case the
+# first event builds it
 app = None
+if os.environ.get("PRIME_ON_INIT", "true").lower() in ("1", "true", "yes"):
+    app = prime_app()
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> None:
@@ -49,8 +75,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> None:
 
     print(f"LAMBDA DEBUG: Processing event: {event}")
     try:
-        for record in event['Records']:
-            app.handle(json.loads(record["body"]), context)
+        if "Records" in event:
+            for record in event['Records']:
+                app.handle(json.loads(record["body"]), context)
+        else:
+            # Invoked directly, e.g. by an EventBridge warmup schedule
+            app.handle(event, context)
         print("LAMBDA DEBUG: Event handling completed successfully")
     except Exception as e:
         print(f"LAMBDA DEBUG: Error handling event: {str(e)}")
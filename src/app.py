@@ -1,8 +1,16 @@
 from src.news.collector import NewsCollector
 from src.news.builder import NewsletterBuilder
+from src.news.batch import SummaryBatch
+from src.news.deadline import Deadline
+from src.news.digest import WeeklyDigest
+from src.news.service import NewsService
 from lib.external.express import Express
+from lib.external.fulltext import FullText
 from lib.external.gnews import GNews
 from lib.langchain.openai import OpenAI
+from lib.langchain.simhash import SimHashIndex
+from lib.infra.sqs import SQS
+from lib.infra.throttle import Throttle
 from config import BaseConfig
 from typing import Any, Dict
 import logging
@@ -20,9 +28,9 @@ class Config(dict):
         """Load configuration from an object's class attributes"""
         for key in dir(obj):
             if not key.startswith('__') and not callable(getattr(obj, key)):
-                value = getattr(obj, key)
-                self.config[key] = value
-                print(f"Loaded config: {key}={value}")
+                self.config[key] = getattr(obj, key)
+        # Names only: one line instead of a line per value, and no secrets in the logs
+        print(f"Loaded config: {', '.join(sorted(self.config))}")
 
 
 class App:
@@ -32,9 +40,15 @@ class App:
 
     def init_app(self):
         # Don't initialize services again - they're already initialized in create_app
-        # Only create service instances
-        self.collector = NewsCollector()
-        self.builder = NewsletterBuilder()
+        # Only create service instances; collect and build share one
+        # service so its clients and connection pools are built once
+        service = NewsService()
+        self.collector = NewsCollector(service)
+        self.builder = NewsletterBuilder(service)
+
+    def prime(self, connect: bool = True) -> Dict[str, float]:
+        """Get clients, templates and connections ready ahead of the next event"""
+        return self.collector.service.prime(connect)
 
     def handle(self, event: Dict[str, Any], context: Any):
         """
@@ -49,13 +63,19 @@ class App:
             parsed_event = LambdaEvent.model_validate(event)
             detail = parsed_event.detail
 
+            # Scheduled pings that keep the container and its connections warm
+            if detail.eventType == "warmup":
+                self.prime()
+                return
+
             # Process based on event type
             if detail.eventType == "collect":
                 self.collector.collect(
                     detail.providerId,
                     detail.locale,
                     detail.tags,
-                    detail.dispatchDay or 0
+                    detail.dispatchDay or 0,
+                    Deadline(context)
                 )
 
             elif detail.eventType == "build":
@@ -65,6 +85,12 @@ class App:
                     detail.tags
                 )
 
+            elif detail.eventType == "submit_batch":
+                self.collector.submit_batch()
+
+            elif detail.eventType == "ingest_batch":
+                self.collector.ingest_batch()
+
             else:
                 print(f"Unsupported event type: {detail.eventType}")
 
@@ -75,22 +101,8 @@ class App:
 
 
 def create_app():
-    import logging
-    import os
-    from dotenv import load_dotenv
-    from pathlib import Path
-
-    # Load environment variables from .env file with explicit path
-    dotenv_path = Path(__file__).parent.parent / '.env'
-    load_dotenv(dotenv_path=dotenv_path)
-    print(f"LAMBDA DEBUG: Loading .env from {dotenv_path}")
-    
-    # Debug environment variables
-    print("LAMBDA DEBUG: Environment variables after loading:")
-    print(f"OPENAI_API_KEY set: {bool(os.environ.get('OPENAI_API_KEY'))}")
-    print(f"GNEWS_API_KEY set: {bool(os.environ.get('GNEWS_API_KEY'))}")
-    print(f"AWS_REGION set: {bool(os.environ.get('AWS_REGION'))}")
-    
+    # The entry point (main.py, backfill.py) loads .env before config.py is
+    # imported, since BaseConfig reads the environment at import time
     print("LAMBDA DEBUG: Starting create_app function")
 
     try:
@@ -102,10 +114,21 @@ def create_app():
         BaseConfig(app)
         print("LAMBDA DEBUG: Initializing OpenAI")
         OpenAI.init_app(app)
+        SimHashIndex.init_app(app)
         print("LAMBDA DEBUG: Initializing GNews")
         GNews.init_app(app)
+        FullText.init_app(app)
         print("LAMBDA DEBUG: Initializing Express")
         Express.init_app(app)
+        print("LAMBDA DEBUG: Initializing SummaryBatch")
+        SummaryBatch.init_app(app)
+        print("LAMBDA DEBUG: Initializing WeeklyDigest")
+        WeeklyDigest.init_app(app)
+        print("LAMBDA DEBUG: Initializing Deadline and SQS")
+        Deadline.init_app(app)
+        SQS.init_app(app)
+        print("LAMBDA DEBUG: Initializing Throttle")
+        Throttle.init_app(app)
         print("LAMBDA DEBUG: Service classes initialized")
 
         # Only create service instances after initializing all services
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from lib.infra.throttle import Throttle, SERVICES
+from src.models.events import NewsEventDetail
+
+# One app per worker process, so clients, the Jinja env and the service
+# caches are built once and shared by every job that worker runs
+_worker_app: Any = None
+
+
+def job_key(job: Dict[str, Any]) -> str:
+    """Stable identifier for a job line, used for checkpointing"""
+    if job.get("id"):
+        return str(job["id"])
+    canonical = json.dumps(job, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def read_jobs(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Read provider/tag/locale jobs from a JSONL file
+
+    Each line is a `NewsEventDetail` payload plus an optional `id`.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            job = json.loads(line)
+            detail = {k: v for k, v in job.items() if k != "id"}
+            try:
+                NewsEventDetail.model_validate(detail)
+            except Exception as e:
+                raise ValueError(f"Invalid job on line {line_no}: {e}")
+            yield job_key(job), detail
+
+
+class Checkpoint:
+    """Append-only JSONL log of finished jobs, used to resume a backfill"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def completed(self) -> Set[str]:
+        done: Set[str] = set()
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted run
+                    continue
+                if entry.get("status") == "ok":
+                    done.add(entry["key"])
+        return done
+
+    def record(self, key: str, status: str, latency: float, error: Optional[str] = None) -> None:
+        entry = {"key": key, "status": status, "latency": round(latency, 3)}
+        if error:
+            entry["error"] = error
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _init_worker(semaphores: Dict[str, Any], workers: int) -> None:
+    global _worker_app
+    Throttle.configure(semaphores)
+
+    from src.app import create_app
+    _worker_app = create_app()
+    # The configured rates are account-wide; each worker gets an equal share
+    Throttle.scale(1.0 / max(workers, 1))
+
+
+def _throttle_delta(before: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Rate-limit counters this worker accumulated since `before`"""
+    delta = {}
+    for service, stats in Throttle.stats().items():
+        previous = before.get(service, {})
+        delta[service] = {
+            name: stats[name] - previous.get(name, 0)
+            for name in ("calls", "rate_limited", "throttled_s")
+        }
+    return delta
+
+
+def _run_job(key: str, detail: Dict[str, Any]) -> Tuple[str, bool, float, Optional[str], Dict[str, Dict[str, Any]]]:
+    event = NewsEventDetail.model_validate(detail)
+    before = Throttle.stats()
+    start = time.perf_counter()
+    try:
+        if event.eventType == "collect":
+            _worker_app.collector.collect(
+                event.providerId, event.locale, event.tags, event.dispatchDay or 0)
+        elif event.eventType == "build":
+            _worker_app.builder.build(
+                event.providerId, event.locale, event.tags)
+        else:
+            raise ValueError(f"Unsupported event type: {event.eventType}")
+        return key, True, time.perf_counter() - start, None, _throttle_delta(before)
+    except Exception as e:
+        return key, False, time.perf_counter() - start, str(e), _throttle_delta(before)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _merge_throttle_stats(samples: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    merged: Dict[str, Dict[str, Any]] = {}
+    for sample in samples:
+        for service, stats in sample.items():
+            total = merged.setdefault(service, {"calls": 0, "rate_limited": 0, "throttled_s": 0.0})
+            total["calls"] += stats["calls"]
+            total["rate_limited"] += stats["rate_limited"]
+            total["throttled_s"] = round(total["throttled_s"] + stats["throttled_s"], 3)
+    return merged
+
+
+def run(jobs_path: str, checkpoint_path: str, workers: int,
+        limits: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Run a backfill across a process pool
+
+    Args:
+        jobs_path: JSONL file of collect/build jobs
+        checkpoint_path: JSONL progress log; jobs already recorded as ok are skipped
+        workers: Number of worker processes
+        limits: Max in-flight calls per external service, across all workers
+
+    Returns:
+        Throughput and latency report
+    """
+    checkpoint = Checkpoint(checkpoint_path)
+    done = checkpoint.completed()
+
+    pending = [(key, detail)
+               for key, detail in read_jobs(jobs_path) if key not in done]
+    print(f"Backfill: {len(pending)} pending jobs, {len(done)} already done")
+
+    semaphores = {
+        service: multiprocessing.BoundedSemaphore(limit)
+        for service, limit in (limits or {}).items()
+        if service in SERVICES and limit > 0
+    }
+
+    latencies: List[float] = []
+    failures = 0
+    throttle: List[Dict[str, Dict[str, Any]]] = []
+    start = time.perf_counter()
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(semaphores, workers)) as pool:
+            futures = [pool.submit(_run_job, key, detail)
+                       for key, detail in pending]
+            for future in as_completed(futures):
+                key, ok, latency, error, throttled = future.result()
+                throttle.append(throttled)
+                checkpoint.record(key, "ok" if ok else "failed", latency, error)
+                latencies.append(latency)
+                if not ok:
+                    failures += 1
+                    print(f"Backfill job {key} failed after {latency:.2f}s: {error}")
+
+    elapsed = time.perf_counter() - start
+    report = {
+        "jobs": len(latencies),
+        "skipped": len(done),
+        "failed": failures,
+        "elapsed_s": round(elapsed, 3),
+        "jobs_per_s": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+        "latency_p50_s": round(_percentile(latencies, 50), 3),
+        "latency_p95_s": round(_percentile(latencies, 95), 3),
+        "latency_max_s": round(max(latencies), 3) if latencies else 0.0,
+        "throttle": _merge_throttle_stats(throttle),
+    }
+    print(f"Backfill report: {json.dumps(report)}")
+    return report
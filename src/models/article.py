@@ -0,0 +1,70 @@
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+
+def parse_publish_time(value: str) -> datetime:
+    """Parse a GNews ISO8601 timestamp, dropping the trailing 'Z'"""
+    if value.endswith('Z'):
+        value = value[:-1]
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S")
+
+
+class Article:
+    """Compact news article record with the publish time parsed once"""
+    __slots__ = ("title", "description", "content", "url", "source", "published", "fulltext")
+
+    def __init__(self, title: str, description: str, content: str, url: str,
+                 source: str, published: datetime, fulltext: Optional[str] = None):
+        self.title = title
+        self.description = description
+        self.content = content
+        self.url = url
+        self.source = source
+        self.published = published
+        # Publisher page text from full-text enrichment; GNews `content` is truncated
+        self.fulltext = fulltext
+
+    @classmethod
+    def from_gnews(cls, raw: Dict[str, Any]) -> "Article":
+        return cls(
+            title=raw.get("title", ""),
+            description=raw.get("description", ""),
+            content=raw.get("content", ""),
+            url=raw.get("url", ""),
+            source=(raw.get("source") or {}).get("name", ""),
+            published=parse_publish_time(raw.get("publishedAt", "")),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Article":
+        return cls(
+            title=data["title"],
+            description=data["description"],
+            content=data["content"],
+            url=data["url"],
+            source=data["source"],
+            published=datetime.fromisoformat(data["published"]),
+            fulltext=data.get("fulltext"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "description": self.description,
+            "content": self.content,
+            "url": self.url,
+            "source": self.source,
+            "published": self.published.isoformat(),
+            "fulltext": self.fulltext,
+        }
+
+    @property
+    def maintext(self) -> str:
+        return self.fulltext or self.content
+
+    @property
+    def publish_date(self) -> date:
+        return self.published.date()
+
+    def __repr__(self) -> str:
+        return f"Article(url={self.url!r}, published={self.published.isoformat()})"
@@ -1,15 +1,24 @@
 from typing import List, Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class NewsEventDetail(BaseModel):
     """Event detail structure for news processing events"""
-    eventType: Literal["collect", "build"]
-    providerId: str
-    locale: str
-    tags: List[str]
+    eventType: Literal["collect", "build", "submit_batch", "ingest_batch", "warmup"]
+    # Batch and warmup events cover every provider, so these are only required for collect/build
+    providerId: str = ""
+    locale: str = ""
+    tags: List[str] = []
     dispatchDay: Optional[int] = None
 
+    @model_validator(mode="after")
+    def require_provider_fields(self) -> "NewsEventDetail":
+        if self.eventType in ("collect", "build"):
+            missing = [name for name in ("providerId", "locale", "tags") if name not in self.model_fields_set]
+            if missing:
+                raise ValueError(f"{self.eventType} events require {', '.join(missing)}")
+        return self
+
 
 class LambdaEvent(BaseModel):
     """AWS Lambda event structure"""
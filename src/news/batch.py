@@ -0,0 +1,223 @@
+import json
+from datetime import date, datetime
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from lib.external.openai_batch import (
+    BatchSubmitter, LocalBatchSubmitter, OpenAIBatchSubmitter, TERMINAL_STATES, parse_batch_output)
+from lib.infra.s3 import S3
+from lib.langchain.openai import OpenAI
+
+
+class SummaryBatch:
+    """
+    Deferred daily summaries through the OpenAI Batch API
+
+    Collect runs queue their per-date summary requests under `batch/pending/`,
+    a submit event merges every pending file into one batch, and an ingest
+    event hands the finished summaries back to the caller for storage.
+    """
+    MODE: str = "sync"
+    LOCAL_DIR: str = ""
+
+    PENDING_DIR = "batch/pending/"
+    SUBMITTED_DIR = "batch/submitted/"
+    # Submits a request may take part in before its failures are dropped
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, s3: S3, openAI: OpenAI, submitter: Optional[BatchSubmitter] = None):
+        self.s3 = s3
+        self.openAI = openAI
+        self._submitter = submitter
+
+    @classmethod
+    def init_app(cls, app: Any) -> None:
+        cls.MODE = app.config.get("SUMMARY_MODE", "sync") or "sync"
+        cls.LOCAL_DIR = app.config.get("BATCH_LOCAL_DIR", "")
+        print(f"Summary mode: {cls.MODE}" +
+              (f" (local batch dir {cls.LOCAL_DIR})" if cls.LOCAL_DIR else ""))
+
+    @property
+    def enabled(self) -> bool:
+        return SummaryBatch.MODE == "batch"
+
+    @property
+    def submitter(self) -> BatchSubmitter:
+        if self._submitter is None:
+            if SummaryBatch.LOCAL_DIR:
+                self._submitter = LocalBatchSubmitter(SummaryBatch.LOCAL_DIR)
+            else:
+                self._submitter = OpenAIBatchSubmitter(OpenAI.API_KEY)
+        return self._submitter
+
+    @staticmethod
+    def custom_id(provider_id: str, summary_date: date) -> str:
+        return f"{provider_id}/{summary_date.isoformat()}"
+
+    def queue(self, provider_id: str, locale: str, tags: List[str],
+              requests: List[Tuple[date, Any, List[str]]]) -> None:
+        """
+        Write one provider's summary requests as a pending batch fragment
+
+        Args:
+            provider_id: The provider identifier
+            locale: The locale the summaries are written in
+            tags: News keywords of the provider
+            requests: (date, prompt messages, article urls) per summary
+        """
+        lines = []
+        meta = {}
+        for summary_date, messages, urls in requests:
+            custom_id = self.custom_id(provider_id, summary_date)
+            lines.append(json.dumps(
+                self.openAI.to_batch_request(custom_id, messages), ensure_ascii=False))
+            meta[custom_id] = {"providerId": provider_id, "locale": locale, "tags": tags,
+                               "date": summary_date.isoformat(), "urls": urls}
+
+        self._write_fragment(provider_id, lines, meta, datetime.utcnow())
+        print(f"Queued {len(lines)} summary requests for provider {provider_id}")
+
+    def _write_fragment(self, provider_id: str, lines: List[str],
+                        meta: Dict[str, Dict[str, Any]], stamp: datetime) -> None:
+        """Upload a pending fragment; `stamp` orders it against the provider's other fragments"""
+        prefix = f"{SummaryBatch.PENDING_DIR}{provider_id}/{stamp.strftime('%Y%m%dT%H%M%S%f')}"
+        # The meta goes first: submit skips a .jsonl whose meta is missing
+        if self.s3.upload_file_object(self.s3.deserialize_json(meta), f"{prefix}.meta.json") is None \
+                or self.s3.upload_file_object(self._jsonl_file(lines), f"{prefix}.jsonl") is None:
+            raise RuntimeError(f"Failed to upload batch fragment {prefix}")
+
+    def submit(self) -> Optional[str]:
+        """Merge all pending fragments into one batch and submit it"""
+        keys = sorted(k for k in self.s3.get_files_from_dir(SummaryBatch.PENDING_DIR)
+                      if k.endswith(".jsonl"))
+        if not keys:
+            print("No pending summary requests to submit")
+            return None
+
+        # Fragments sort oldest first, so a newer request for the same
+        # provider and date replaces the older one
+        requests: Dict[str, str] = {}
+        meta: Dict[str, Dict[str, Any]] = {}
+        for key in keys:
+            data = self.s3.get_file_object(key)
+            fragment_meta = self.s3.serialize_json_files(
+                [key[:-len(".jsonl")] + ".meta.json"])
+            if data is None or not fragment_meta:
+                print(f"Skipping incomplete batch fragment {key}")
+                continue
+            for line in data.decode("utf-8").splitlines():
+                if line.strip():
+                    custom_id = json.loads(line)["custom_id"]
+                    requests[custom_id] = line
+            meta.update(fragment_meta[0])
+
+        if not requests:
+            return None
+
+        batch_id = self.submitter.submit(
+            self._jsonl_file(list(requests.values())).getvalue())
+        manifest = {"batchId": batch_id,
+                    "submittedAt": datetime.utcnow().isoformat(),
+                    "requests": {custom_id: meta[custom_id] for custom_id in requests}}
+        # The request lines are kept so failed requests can be queued again;
+        # without the manifest the batch would never be ingested, so the
+        # pending fragments stay until both are stored
+        prefix = f"{SummaryBatch.SUBMITTED_DIR}{batch_id}"
+        if self.s3.upload_file_object(self._jsonl_file(list(requests.values())), f"{prefix}.jsonl") is None \
+                or self.s3.upload_file_object(self.s3.deserialize_json(manifest), f"{prefix}.json") is None:
+            raise RuntimeError(f"Failed to store the manifest of batch {batch_id}")
+
+        for key in keys:
+            self.s3.delete_file_object(key)
+            self.s3.delete_file_object(key[:-len(".jsonl")] + ".meta.json")
+        print(f"Submitted batch {batch_id} with {len(requests)} summary requests")
+        return batch_id
+
+    def ingest(self, store: Callable[[Dict[str, Any], dict], None]) -> int:
+        """
+        Store the summaries of every finished batch
+
+        Requests without a usable summary, because the batch failed, expired
+        or was cancelled or because the request itself errored, are queued
+        again for the next submit, up to MAX_ATTEMPTS times.
+
+        Args:
+            store: Called with (request metadata, summary) per summary
+
+        Returns:
+            Number of summaries stored
+        """
+        stored = 0
+        for key in self.s3.get_files_from_dir(SummaryBatch.SUBMITTED_DIR):
+            if not key.endswith(".json"):
+                continue
+            manifests = self.s3.serialize_json_files([key])
+            if not manifests:
+                continue
+            manifest = manifests[0]
+            batch_id = manifest["batchId"]
+
+            status = self.submitter.status(batch_id)
+            if status not in TERMINAL_STATES:
+                print(f"Batch {batch_id} is {status}, will check again later")
+                continue
+
+            results = parse_batch_output(self.submitter.results(batch_id)) \
+                if status == "completed" else {}
+            failed = []
+            for custom_id, request in manifest["requests"].items():
+                content = results.get(custom_id)
+                if content is None:
+                    print(f"No summary for {custom_id} in batch {batch_id} ({status})")
+                    failed.append(custom_id)
+                    continue
+                try:
+                    summary = self.openAI.parse_json_result(content)
+                except ValueError as e:
+                    print(f"Bad summary for {custom_id} in batch {batch_id}: {e}")
+                    failed.append(custom_id)
+                    continue
+                store(request, summary)
+                stored += 1
+
+            lines_key = key[:-len(".json")] + ".jsonl"
+            if failed:
+                self._requeue(manifest, failed, lines_key)
+            self.s3.delete_file_object(key)
+            self.s3.delete_file_object(lines_key)
+            print(f"Ingested batch {batch_id} ({status})")
+        return stored
+
+    def _requeue(self, manifest: Dict[str, Any], custom_ids: List[str], lines_key: str) -> None:
+        """Write the given requests of a finished batch back as pending fragments"""
+        data = self.s3.get_file_object(lines_key)
+        if data is None:
+            print(f"Request lines of batch {manifest['batchId']} are missing, "
+                  f"cannot queue {len(custom_ids)} failed requests again")
+            return
+        lines = {}
+        for line in data.decode("utf-8").splitlines():
+            if line.strip():
+                lines[json.loads(line)["custom_id"]] = line
+
+        by_provider: Dict[str, Tuple[List[str], Dict[str, Dict[str, Any]]]] = {}
+        for custom_id in custom_ids:
+            request = dict(manifest["requests"][custom_id])
+            request["attempts"] = request.get("attempts", 1) + 1
+            if request["attempts"] > SummaryBatch.MAX_ATTEMPTS or custom_id not in lines:
+                print(f"Giving up on {custom_id} after {request['attempts'] - 1} attempts")
+                continue
+            provider_lines, provider_meta = by_provider.setdefault(request["providerId"], ([], {}))
+            provider_lines.append(lines[custom_id])
+            provider_meta[custom_id] = request
+
+        # Stamped with the submit time so a request queued since then for the
+        # same provider and date still replaces the retried one
+        stamp = datetime.fromisoformat(manifest["submittedAt"])
+        for provider_id, (provider_lines, provider_meta) in by_provider.items():
+            self._write_fragment(provider_id, provider_lines, provider_meta, stamp)
+            print(f"Queued {len(provider_lines)} failed summary requests again for provider {provider_id}")
+
+    @staticmethod
+    def _jsonl_file(lines: List[str]) -> BytesIO:
+        return BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
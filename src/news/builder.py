@@ -1,13 +1,13 @@
 import logging
-from typing import List
+from typing import List, Optional
 from src.news.service import NewsService
 
 
 class NewsletterBuilder:
     """Handles newsletter building operations"""
 
-    def __init__(self):
-        self.service = NewsService()
+    def __init__(self, service: Optional[NewsService] = None):
+        self.service = service or NewsService()
 
     def build(self, provider_id: str, locale: str, tags: List[str]) -> None:
         """
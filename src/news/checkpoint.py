@@ -0,0 +1,56 @@
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib.infra.s3 import S3
+from src.models.article import Article
+
+
+class CollectCheckpoint:
+    """
+    Unfinished collect work for a provider, saved when a run stops early
+
+    Holds the deduplicated articles of every date not yet summarized, so a
+    resumed run skips the fetch and dedup stages (whose new vectors were
+    already saved with the vector DB) and only summarizes what is left.
+    """
+    # An older checkpoint's continuation is presumed lost; its articles are
+    # merged into a fresh fetch instead of standing in for one
+    MAX_AGE = timedelta(hours=12)
+
+    def __init__(self, s3: S3):
+        self.s3 = s3
+
+    @staticmethod
+    def key(provider_id: str) -> str:
+        return f"{provider_id}/checkpoint/collect.json"
+
+    def load(self, provider_id: str) -> Optional[Tuple[Dict[date, List[Article]], bool]]:
+        """Pending articles by date and whether the checkpoint is older than MAX_AGE"""
+        # A checkpoint that can't be read raises: treated as absent, its
+        # articles would be lost to the next save
+        data = self.s3.find_file_object(self.key(provider_id))
+        if data is None:
+            return None
+        checkpoint = json.loads(data)
+
+        pending = {
+            date.fromisoformat(day): [Article.from_dict(article) for article in articles]
+            for day, articles in checkpoint["pending"].items()
+        }
+        stale = datetime.utcnow() - datetime.fromisoformat(checkpoint["savedAt"]) > self.MAX_AGE
+        return pending, stale
+
+    def save(self, provider_id: str, pending: Dict[date, List[Article]]) -> None:
+        checkpoint: Dict[str, Any] = {
+            "savedAt": datetime.utcnow().isoformat(),
+            "pending": {day.isoformat(): [article.to_dict() for article in articles]
+                        for day, articles in pending.items()},
+        }
+        if self.s3.upload_file_object(
+                self.s3.deserialize_json(checkpoint), self.key(provider_id)) is None:
+            raise RuntimeError(f"Failed to save collect checkpoint for provider {provider_id}")
+        print(f"Checkpointed {len(pending)} pending dates for provider {provider_id}")
+
+    def clear(self, provider_id: str) -> None:
+        self.s3.delete_file_object(self.key(provider_id))
@@ -1,15 +1,17 @@
 import logging
-from typing import List
+from typing import List, Optional
+from src.news.deadline import Deadline
 from src.news.service import NewsService
 
 
 class NewsCollector:
     """Handles news collection operations"""
 
-    def __init__(self):
-        self.service = NewsService()
+    def __init__(self, service: Optional[NewsService] = None):
+        self.service = service or NewsService()
 
-    def collect(self, provider_id: str, locale: str, tags: List[str], dispatch_day: int = 0) -> None:
+    def collect(self, provider_id: str, locale: str, tags: List[str], dispatch_day: int = 0,
+                deadline: Optional[Deadline] = None) -> None:
         """
         Collect and summarize daily news for a provider
 
@@ -18,15 +20,36 @@ class NewsCollector:
             locale: The locale for news articles
             tags: List of news keywords to collect
             dispatch_day: Day offset for dispatch
+            deadline: Remaining Lambda time; unfinished work is checkpointed
         """
         print(
             f"Collecting news for provider: {provider_id}, tags: {tags}")
 
         try:
-            self.service.daily_summarize(
-                provider_id, locale, tags, dispatch_day)
-            print(
-                f"Successfully collected news for provider {provider_id}")
+            finished = self.service.daily_summarize(
+                provider_id, locale, tags, dispatch_day, deadline)
+            if finished:
+                print(
+                    f"Successfully collected news for provider {provider_id}")
+            else:
+                print(
+                    f"Checkpointed news collection for provider {provider_id}, continuing in a new event")
         except Exception as e:
             print(f"Failed to collect news: {str(e)}")
             raise
+
+    def submit_batch(self) -> None:
+        """Submit all queued daily summary requests as one OpenAI batch"""
+        try:
+            self.service.submit_summary_batch()
+        except Exception as e:
+            print(f"Failed to submit summary batch: {str(e)}")
+            raise
+
+    def ingest_batch(self) -> None:
+        """Store the daily summaries of finished OpenAI batches"""
+        try:
+            self.service.ingest_summary_batch()
+        except Exception as e:
+            print(f"Failed to ingest summary batch: {str(e)}")
+            raise
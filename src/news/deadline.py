@@ -0,0 +1,56 @@
+import time
+from typing import Any, Dict, Optional
+
+
+class Deadline:
+    """
+    Tracks the Lambda time budget so expensive stages only start when they
+    can finish and still leave room to checkpoint
+
+    Stage estimates start from the defaults below, or from the slowest run
+    this container has seen, and grow to the slowest run of that stage seen
+    in this invocation. The first stage of an event always runs, so a
+    timeout shorter than one estimate still makes progress; the fetch is
+    always that first stage, so it is observed but has no estimate. Without
+    a Lambda context (local runs, the bulk runner) every stage is allowed.
+    """
+    RESERVE_MS: int = 15000
+    DEFAULT_ESTIMATES_MS: Dict[str, int] = {
+        "summary": 30000,
+        "intro": 30000,
+    }
+
+    # Slowest run of each stage in this container, so a stage that runs
+    # once per event, like the intro, still informs the next event's check
+    _observed_ms: Dict[str, int] = {}
+
+    def __init__(self, context: Any = None):
+        self._remaining = getattr(context, "get_remaining_time_in_millis", None)
+        self._estimates = {**Deadline.DEFAULT_ESTIMATES_MS, **Deadline._observed_ms}
+        self._progressed = False
+
+    @classmethod
+    def init_app(cls, app: Any) -> None:
+        cls.RESERVE_MS = int(app.config.get("DEADLINE_RESERVE_MS", cls.RESERVE_MS) or cls.RESERVE_MS)
+
+    def remaining_ms(self) -> Optional[int]:
+        if self._remaining is None:
+            return None
+        return int(self._remaining())
+
+    def allows(self, stage: str) -> bool:
+        remaining = self.remaining_ms()
+        if remaining is None or not self._progressed:
+            return True
+        needed = self._estimates.get(stage, 0) + Deadline.RESERVE_MS
+        if remaining < needed:
+            print(f"Deadline: {remaining}ms left, {stage} needs ~{needed}ms; stopping here")
+            return False
+        return True
+
+    def observe(self, stage: str, started: float) -> None:
+        """Record how long a stage that began at `started` (perf_counter) took"""
+        self._progressed = True
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        self._estimates[stage] = max(self._estimates.get(stage, 0), elapsed_ms)
+        Deadline._observed_ms[stage] = max(Deadline._observed_ms.get(stage, 0), elapsed_ms)
@@ -0,0 +1,101 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from lib.infra.s3 import S3
+
+
+class WeeklyDigest:
+    """
+    Per-provider newsletter content, kept current by every collect run
+
+    The digest holds the daily summaries collected since the last build,
+    ordered by date, and optionally an intro and outro written for exactly
+    that content, so a build only has to fetch it, render and dispatch.
+    """
+    PREGENERATE_INTRO: bool = False
+
+    def __init__(self, s3: S3):
+        self.s3 = s3
+
+    @classmethod
+    def init_app(cls, app: Any) -> None:
+        value = str(app.config.get("DIGEST_PREGENERATE_INTRO", "") or "")
+        cls.PREGENERATE_INTRO = value.lower() in ("1", "true", "yes")
+        print(f"Digest intro pre-generation: {cls.PREGENERATE_INTRO}")
+
+    @staticmethod
+    def key(provider_id: str) -> str:
+        return f"{provider_id}/digest/current.json"
+
+    @staticmethod
+    def fingerprint(articles: List[Dict[str, Any]]) -> str:
+        canonical = json.dumps(articles, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+    def load(self, provider_id: str) -> Optional[Dict[str, Any]]:
+        # No digest is the normal state after a build; a digest that can't be
+        # read raises rather than being replaced by an empty one
+        data = self.s3.find_file_object(self.key(provider_id))
+        if data is None:
+            return None
+        return json.loads(data)
+
+    def update(self, provider_id: str, locale: str, tags: List[str],
+               summaries: List[Dict[str, Any]],
+               write_intro: Optional[Callable[[str, List[str], List[Dict[str, Any]]], Dict[str, str]]]) -> None:
+        """
+        Merge new daily summaries into the provider's digest
+
+        Args:
+            provider_id: The provider identifier
+            locale: The locale for the newsletter
+            tags: News keywords of the newsletter
+            summaries: Daily summaries, each carrying its `date`
+            write_intro: Produces {"intro", "outro"} for a list of summaries;
+                None leaves the intro to the build
+        """
+        if not summaries:
+            return
+
+        digest = self.load(provider_id) or {"providerId": provider_id, "articles": []}
+
+        # A newer summary for a date replaces the older one
+        by_date = {article["date"]: article for article in digest["articles"]}
+        for summary in summaries:
+            by_date[summary["date"]] = summary
+        articles = [by_date[date] for date in sorted(by_date)]
+
+        fingerprint = self.fingerprint(articles)
+        if fingerprint == digest.get("fingerprint"):
+            return
+
+        digest.update({
+            "locale": locale,
+            "tags": tags,
+            "articles": articles,
+            "fingerprint": fingerprint,
+            "updatedAt": datetime.utcnow().isoformat(),
+        })
+
+        if WeeklyDigest.PREGENERATE_INTRO and write_intro is not None:
+            digest.update(write_intro(locale, tags, articles))
+            digest["introFingerprint"] = fingerprint
+
+        self.s3.upload_file_object(
+            self.s3.deserialize_json(digest), self.key(provider_id))
+        print(f"Updated digest for provider {provider_id} ({len(articles)} days)")
+
+    @staticmethod
+    def current_intro(digest: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """The stored intro and outro, if they were written for the current content"""
+        if digest.get("introFingerprint") != digest.get("fingerprint"):
+            return None
+        return {"intro": digest["intro"], "outro": digest["outro"]}
+
+    def archive(self, provider_id: str, dispatch_date: str) -> None:
+        """Move the dispatched digest aside so the next week starts empty"""
+        self.s3.copy_s3_file(self.s3.bucket, self.key(provider_id),
+                             self.s3.bucket, f"{provider_id}/digest/{dispatch_date}.json")
+        self.s3.delete_file_object(self.key(provider_id))
@@ -1,119 +1,220 @@
-from typing import List
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from jinja2 import Environment, FileSystemLoader
 from lib.external.express import Express
 from lib.infra.s3 import S3
+from lib.infra.sqs import SQS
+from lib.infra.throttle import Throttle
+from lib.external.fulltext import FullText
 from lib.external.gnews import GNews
 from lib.langchain.openai import OpenAI
-from datetime import datetime, timedelta
+from lib.langchain.simhash import SIMHASH_FILE, SimHashIndex, simhash
+from lib.langchain.vectorstore import DOCSTORE_FILE, INDEX_FILE, LEGACY_DOCSTORE_FILE
+from src.models.article import Article
+from src.news.batch import SummaryBatch
+from src.news.checkpoint import CollectCheckpoint
+from src.news.deadline import Deadline
+from src.news.digest import WeeklyDigest
+from src.news.stages import StageScheduler
+from datetime import date, datetime, timedelta
 import json
 from collections import defaultdict
-from functools import lru_cache
+from itertools import groupby
+from operator import attrgetter
 from io import BytesIO
 import os
-import shutil
-import tempfile
+import time
 
 
 class NewsService:
+    PRIME_TIMEOUT_S: float = 3.0
+
     def __init__(self):
         self.openAI = OpenAI()
         self.gnews = GNews()
+        self.fulltext = FullText()
         self.s3 = S3()
         # Use absolute path for templates
         template_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "template")
         print(f"Loading templates from: {template_dir}")
         self.env = Environment(loader=FileSystemLoader(template_dir))
         self.express = Express()
+        self.batch = SummaryBatch(self.s3, self.openAI)
+        self.digest = WeeklyDigest(self.s3)
+        self.checkpoints = CollectCheckpoint(self.s3)
+        self.sqs = SQS()
+
+    def prime(self, connect: bool = True) -> Dict[str, float]:
+        """
+        Build the lazily created clients and load the template so the first
+        event doesn't, and with `connect` open a pooled connection to each
+        endpoint as well
+
+        Every step is best effort; a failure only means that step stays
+        lazy. Returns the milliseconds each step took.
+        """
+        timings: Dict[str, float] = {}
+
+        def step(name: str, fn: Callable[[], Any]) -> None:
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                print(f"Priming {name} failed: {e}")
+            timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+        step("template", lambda: self.env.get_template("template.html"))
+        step("s3:client", lambda: self.s3.client)
+        step("sqs:client", lambda: self.sqs.client)
+        if connect:
+            # Handshakes overlap, and an unreachable endpoint can't hold up
+            # the init phase for longer than PRIME_TIMEOUT_S
+            pool = ThreadPoolExecutor(max_workers=4)
+            connects = [pool.submit(step, name, fn) for name, fn in (
+                ("s3:connect", self.s3.warm),
+                ("openai:connect", self.openAI.warm),
+                ("gnews:connect", self.gnews.warm),
+                ("express:connect", self.express.warm),
+            )]
+            _, unfinished = wait(connects, timeout=NewsService.PRIME_TIMEOUT_S)
+            pool.shutdown(wait=False)
+            if unfinished:
+                print(f"Priming left {len(unfinished)} connections opening in the background")
+        print(f"Primed in ms: {json.dumps(timings)}")
+        return timings
+
+    def _iter_articles(self, fetches: List[Future]) -> Iterator[Article]:
+        """Stream article records as each tag's GNews request completes"""
+        for future in as_completed(fetches):
+            for raw in future.result():
+                try:
+                    article = Article.from_gnews(raw)
+                except ValueError as e:
+                    print(f"Skipping article with bad publish date {raw.get('url')}: {e}")
+                    continue
+                if article.maintext:
+                    yield article
+
+    def _iter_unique(self, articles: Iterable[Article], db, signatures: SimHashIndex) -> Iterator[Article]:
+        """
+        Yield the articles neither store has seen, recording each one
+
+        Near-exact copies (reposts, wire stories) are settled by SimHash
+        without a network call; only the rest pay for an embedding.
+        """
+        settled = checked = 0
+        for article in articles:
+            signature = simhash(article.maintext)
+            if signatures.is_near_duplicate(signature):
+                settled += 1
+                continue
+            checked += 1
+            # Duplicate or not, the signature catches the next copy locally
+            signatures.add(signature)
+            if not self.openAI.is_duplicate(db, article.maintext):
+                yield article
+        print(f"Dedup: {settled} near-exact copies settled locally, {checked} embedding checks")
+
+    def _load_vector_db(self, provider_id: str) -> Tuple[Any, SimHashIndex]:
+        """
+        Load the provider's vector DB and the SimHash signatures stored with it
 
-    def _fetch_news(self, provider_id: str, tags: List[str], from_date: datetime) -> List[dict]:
-        news_list = [news for tag in tags for news in self.gnews.get_news(
-            tag, from_date) if news.get("maintext")]
+        A new store is only created when none of its objects is listed. A
+        listed object that can't be read raises instead, since saving a
+        fresh store would overwrite the provider's real one.
+        """
+        prefix = self._vector_db_prefix(provider_id)
+        # A failed listing raises too; it must not pass for an empty one
+        names = {key[len(prefix):] for key in self.s3.list_files(prefix)}
 
-        vector_db_path = self._get_vector_db_path(provider_id)
+        def download(name: str) -> bytes:
+            data = self.s3.get_file_object(f"{prefix}{name}")
+            if data is None:
+                raise RuntimeError(f"Failed to download {prefix}{name}")
+            return data
 
-        db = self.openAI.load_vector_db(
-            vector_db_path) if vector_db_path else None
+        db = None
+        docstore = DOCSTORE_FILE if DOCSTORE_FILE in names else LEGACY_DOCSTORE_FILE
+        if INDEX_FILE in names and docstore in names:
+            # Read straight from the S3 bodies, nothing touches /tmp; None
+            # means a store of another dimension, which is replaced
+            db = self.openAI.load_vector_db({name: download(name) for name in (INDEX_FILE, docstore)})
+        elif INDEX_FILE in names or docstore in names:
+            raise RuntimeError(f"Incomplete vector database for provider {provider_id}: {sorted(names)}")
+        else:
+            print(f"No vector database files found for provider {provider_id}")
 
         if db is None:
             db = self.openAI.create_vector_db()
             # Save the newly created vector DB if there isn't one
             self._save_vector_db(provider_id, db)
 
-        unique_news_list = [
-            news for news in news_list if not self.openAI.is_duplicate(db, news["maintext"])
-        ]
+        signatures = SimHashIndex.from_bytes(download(SIMHASH_FILE)) \
+            if SIMHASH_FILE in names else SimHashIndex()
+        return db, signatures
 
-        # Handle ISO8601 dates with 'Z' timezone indicator
-        def parse_date(date_str):
-            if date_str.endswith('Z'):
-                date_str = date_str[:-1]  # Remove trailing 'Z'
-            return datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S")
-            
-        unique_news_list.sort(key=lambda news: parse_date(news["date_publish"]))
+    def _fetch_news(self, provider_id: str, tags: List[str], from_date: datetime,
+                    stages: StageScheduler) -> List[Article]:
+        # The vector DB download doesn't depend on the news, so it runs
+        # alongside the GNews requests until dedup needs it
+        db_future = stages.submit("vectordb", self._load_vector_db, provider_id)
+        fetches = [stages.submit(f"gnews:{tag}", lambda tag=tag: list(self.gnews.get_news(tag, from_date)))
+                   for tag in tags]
+        articles = self._iter_articles(fetches)
 
+        def dedup():
+            db, signatures = db_future.result()
+            # Only the unique articles are ever held at once, for the sort
+            return sorted(self._iter_unique(articles, db, signatures), key=attrgetter("published"))
+
+        unique_news_list = stages.run("dedup", dedup)
+        # Persist what dedup added before anything else can fail
+        save_future = stages.submit("vectordb:save", self._save_vector_db, provider_id, *db_future.result())
+        if FullText.ENABLED and unique_news_list:
+            # Only articles that survived dedup are worth a publisher fetch
+            stages.run("fulltext", self._enrich, unique_news_list)
+        save_future.result()
         return unique_news_list
 
-    @lru_cache(maxsize=10)
-    def _get_vector_db_path(self, provider_id: str):
-        try:
-            # Get all files in the vector db directory
-            vector_db_files = self.s3.get_files_from_dir(f"{provider_id}/collection/vectordb/")
-            
-            if not vector_db_files:
-                print(f"No vector database files found for provider {provider_id}")
-                return None
-                
-            # Create a temporary directory to download the vector DB files
-            import tempfile
-            import os
-            
-            temp_dir = os.path.join(tempfile.gettempdir(), f"vectordb_{provider_id}")
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # Download all files to the temporary directory
-            for file_key in vector_db_files:
-                # Extract the filename from the key
-                relative_path = file_key.replace(f"{provider_id}/collection/vectordb/", "")
-                target_path = os.path.join(temp_dir, relative_path)
-                
-                # Ensure directory exists
-                os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                
-                # Download the file and copy to target path
-                downloaded_path = self.s3.get_file(file_key)
-                if downloaded_path:
-                    # Copy to the structured directory
-                    shutil.copy2(downloaded_path, target_path)
-            
-            print(f"Downloaded vector database for provider {provider_id} to {temp_dir}")
-            return temp_dir
-        except Exception as e:
-            print(f"Vector database not found for provider {provider_id}, will create a new one: {str(e)}")
-            return None
+    def _enrich(self, articles: List[Article]) -> None:
+        """Swap the truncated GNews content for the publisher's full text where it arrives in time"""
+        texts, _ = self.fulltext.fetch_all([article.url for article in articles])
+        for article in articles:
+            text = texts.get(article.url)
+            if text and len(text) > len(article.content):
+                article.fulltext = text
 
-    def _save_vector_db(self, provider_id: str, db):
-        """Save vector DB to S3"""
+    def _vector_db_prefix(self, provider_id: str) -> str:
+        return f"{provider_id}/collection/vectordb/"
+
+    def _save_vector_db(self, provider_id: str, db, signatures: Optional[SimHashIndex] = None):
+        """Save vector DB, and the SimHash signatures if given, to S3"""
         try:
-            # Save the vector DB locally
-            local_dir = self.openAI.save_vector_db_local(db, "temp_vectordb")
-            print(f"Vector DB saved locally to {local_dir}")
-            
-            # Upload each file in the directory
-            for root, _, files in os.walk(local_dir):
-                for filename in files:
-                    local_file_path = os.path.join(root, filename)
-                    relative_path = os.path.relpath(local_file_path, local_dir)
-                    s3_key = f"{provider_id}/collection/vectordb/{relative_path}"
-                    
-                    # Upload individual file
-                    self.s3.upload_file(local_file_path, s3_key)
-                    print(f"Uploaded {local_file_path} to {s3_key}")
+            # Serialized in memory and uploaded straight from the buffers
+            objects = self.openAI.dump_vector_db(db)
+            if signatures is not None:
+                objects[SIMHASH_FILE] = signatures.to_bytes()
+            for name, data in objects.items():
+                self.s3.upload_file_object(
+                    BytesIO(data), f"{self._vector_db_prefix(provider_id)}{name}")
             
             print(f"Successfully saved vector DB for provider {provider_id}")
         except Exception as e:
             print(f"Failed to save vector DB for provider {provider_id}: {e}")
 
-    def daily_summarize(self, provider_id: str, locale: str, tags: List[str], dispatch_day: int):
+    def daily_summarize(self, provider_id: str, locale: str, tags: List[str], dispatch_day: int,
+                        deadline: Optional[Deadline] = None) -> bool:
+        """
+        Fetch, deduplicate and summarize a provider's news by publish date
+
+        Work left when the deadline runs low is checkpointed and continued
+        by a re-enqueued event; a checkpoint found at start is resumed
+        instead of fetching again, or merged into a fresh fetch once stale.
+
+        Returns:
+            True if every date was summarized (or queued for batch)
+        """
+        deadline = deadline or Deadline()
         today = datetime.now()
         diff = dispatch_day - today.weekday()
         dispatch_date = today + timedelta(days=diff, weeks=-1)
@@ -122,22 +223,121 @@ class NewsService:
             if today - dispatch_date > timedelta(days=2) \
             else dispatch_date
 
-        unique_news_list = self._fetch_news(provider_id, tags, from_date)
+        with StageScheduler() as stages:
+            checkpoint = self.checkpoints.load(provider_id)
+            resumed = checkpoint is not None
+            pending, stale = checkpoint if resumed else ({}, False)
+            if resumed and not stale:
+                print(f"Resuming collect for provider {provider_id}: {len(pending)} dates left")
+            else:
+                if stale:
+                    # Its articles are already in the vector DB and would not
+                    # come back from the fetch, so they join this run's
+                    print(f"Merging stale collect checkpoint for provider {provider_id}: "
+                          f"{len(pending)} dates")
+                started = time.perf_counter()
+                unique_news_list = self._fetch_news(provider_id, tags, from_date, stages)
+                deadline.observe("fetch", started)
+                # Sorted by publish time, so each date is one contiguous run
+                for date, news_group in groupby(unique_news_list, key=attrgetter("publish_date")):
+                    pending.setdefault(date, []).extend(news_group)
+
+            stored = []
+            stopped_early = False
+            try:
+                if self.batch.enabled:
+                    queued = [(date, self._summary_prompt(locale, news_list),
+                               [news.url for news in news_list])
+                              for date, news_list in pending.items()]
+                    if queued:
+                        stages.run("batch:queue", self.batch.queue, provider_id, locale, tags, queued)
+                    pending = {}
+
+                # Dates are summarized in waves the width of the pool; each
+                # summary is uploaded as soon as its own LLM call returns
+                while pending and deadline.allows("summary"):
+                    started = time.perf_counter()
+                    wave = sorted(pending)[:stages.max_workers]
+                    futures = {
+                        date: stages.submit(
+                            f"summary:{date}", self._summarize, provider_id, date,
+                            self._summary_prompt(locale, pending[date]),
+                            [news.url for news in pending[date]])
+                        for date in wave
+                    }
+                    for date, future in futures.items():
+                        stored.append(future.result())
+                        del pending[date]
+                    deadline.observe("summary", started)
+                stopped_early = bool(pending)
+            finally:
+                if pending:
+                    # This run's summaries go into the digest before the
+                    # continuation can start its own update of it, and
+                    # without the intro so the hand-off stays cheap
+                    self._update_digest(stages, provider_id, locale, tags, stored, None)
+                    # Keep whatever was not summarized, whether time ran out
+                    # or a summary failed, so the next run picks it up. Both
+                    # raise, so a failed hand-off fails the event and SQS
+                    # retries it
+                    self.checkpoints.save(provider_id, pending)
+                    if stopped_early:
+                        self._continue_collect(provider_id, locale, tags, dispatch_day)
+                else:
+                    if resumed:
+                        self.checkpoints.clear(provider_id)
+                    def write_intro(*args: Any) -> dict:
+                        started = time.perf_counter()
+                        try:
+                            return self._write_intro_outro(*args)
+                        finally:
+                            deadline.observe("intro", started)
+
+                    # Left to the build when this run has no room for it
+                    self._update_digest(stages, provider_id, locale, tags, stored,
+                                        write_intro if deadline.allows("intro") else None)
+
+        print(f"Collect timeline for provider {provider_id}:\n{stages.report()}")
+        print(f"Throttle stats: {json.dumps(Throttle.stats())}")
+        return not pending
+
+    def _update_digest(self, stages: StageScheduler, provider_id: str, locale: str, tags: List[str],
+                       stored: List[dict], write_intro: Optional[Callable]) -> None:
+        try:
+            stages.run("digest", self.digest.update, provider_id, locale, tags, stored, write_intro)
+        except Exception as e:
+            print(f"Failed to update digest for provider {provider_id}: {e}")
+
+    def _continue_collect(self, provider_id: str, locale: str, tags: List[str], dispatch_day: int) -> None:
+        """Enqueue a collect event that resumes from the provider's checkpoint"""
+        sent = self.sqs.send_event({
+            "source": "infoscribe.collect.continuation",
+            "detail": {
+                "eventType": "collect",
+                "providerId": provider_id,
+                "locale": locale,
+                "tags": tags,
+                "dispatchDay": dispatch_day,
+            },
+        })
+        if not sent:
+            raise RuntimeError(f"Failed to enqueue the collect continuation for provider {provider_id}")
 
-        groups = defaultdict(list)
-        for news in unique_news_list:
-            # Handle ISO8601 dates with 'Z' timezone indicator
-            date_str = news["date_publish"]
-            if date_str.endswith('Z'):
-                date_str = date_str[:-1]  # Remove trailing 'Z'
-            date = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S").date()
-            groups[date].append(news)
+    def _summary_prompt(self, locale: str, news_list: List[Article]) -> Any:
+        contents = [{"title": news.title, "content": news.maintext,
+                     "url": news.url} for news in news_list]
+        # Pass contents directly instead of json-encoded string
+        return self.openAI.generate_prompt(self._summary_preset(locale), contents)
 
-        for date, news_list in groups.items():
-            contents = [{"title": news["title"], "content": news["maintext"],
-                         "url": news["url"]} for news in news_list]
+    def _summarize(self, provider_id: str, date: date, prompt: Any, urls: List[str]) -> dict:
+        # Log the contents for debugging
+        print(f"Generating summary for {len(urls)} articles")
+        response = self.openAI.send_request(prompt)
+        return self._store_summary(
+            provider_id, date, self.openAI.parse_json_result(response), urls)
 
-            news_summarizer = f"""
+    def _summary_preset(self, locale: str) -> str:
+        return f"""
             You are a professional news summarizer. Summarize the given articles into a single, engaging summary.
             ### **Instructions**:
             - **Language:** Write in {locale}.
@@ -155,24 +355,40 @@ class NewsService:
               - `"content"`: Summary text (HTML formatted)
             """
 
-            # Log the contents for debugging
-            print(f"Generating summary for {len(contents)} articles")
-            
-            # Pass contents directly instead of json-encoded string
-            prompt = self.openAI.generate_prompt(news_summarizer, contents)
-            response = self.openAI.send_request(prompt)
+    def _store_summary(self, provider_id: str, date: date, json_obj: dict, urls: List[str]) -> dict:
+        json_obj["urls"] = urls
+        # Convert date object to ISO format string for JSON serialization
+        json_obj["date"] = date.isoformat()
 
-            json_obj = self.openAI.parse_json_result(response)
+        file_obj = self.s3.deserialize_json(json_obj)
+        self.s3.upload_file_object(
+            file_obj, f"{provider_id}/collection/{date}.json")
+        return json_obj
 
-            json_obj["urls"] = [content["url"] for content in contents]
-            # Convert date object to ISO format string for JSON serialization
-            json_obj["date"] = date.isoformat()
+    def submit_summary_batch(self) -> None:
+        self.batch.submit()
 
-            file_obj = self.s3.deserialize_json(json_obj)
-            self.s3.upload_file_object(
-                file_obj, f"{provider_id}/collection/{date}.json")
+    def ingest_summary_batch(self) -> None:
+        by_provider = defaultdict(list)
 
-    def make_newsletter(self, provider_id: str, locale: str, tags: List[str]):
+        def store(request: dict, summary: dict) -> None:
+            stored = self._store_summary(
+                request["providerId"], date.fromisoformat(request["date"]), summary, request["urls"])
+            by_provider[request["providerId"]].append((request, stored))
+
+        self.batch.ingest(store)
+
+        for provider_id, results in by_provider.items():
+            request = results[-1][0]
+            # One provider's unreadable digest shouldn't hold back the others
+            try:
+                self.digest.update(provider_id, request.get("locale", ""), request.get("tags", []),
+                                   [stored for _, stored in results], self._write_intro_outro)
+            except Exception as e:
+                print(f"Failed to update digest for provider {provider_id}: {e}")
+        print(f"Stored batched summaries for {len(by_provider)} providers")
+
+    def _write_intro_outro(self, locale: str, tags: List[str], contents: List[dict]) -> dict:
         intro_and_outro = f"""
         You are a creative newsletter writer. Write an engaging intro and outro for the newsletter.
         ### **Instructions**:
@@ -193,6 +409,14 @@ class NewsService:
           - `"outro"`: Conclusion text
         """
 
+        prompt = self.openAI.generate_prompt(
+            intro_and_outro, contents)
+        response = self.openAI.send_request(prompt)
+        result = self.openAI.parse_json_result(response)
+        return {"intro": result["intro"], "outro": result["outro"]}
+
+    def _load_collection(self, provider_id: str) -> List[dict]:
+        """Read every stored daily summary of a provider, oldest first"""
         files = self.s3.get_files_from_dir(f"{provider_id}/collection/")
         
         # Filter out non-JSON files (like vectordb files)
@@ -202,11 +426,19 @@ class NewsService:
         json_files.sort(key=lambda f: datetime.strptime(
             f.split("/")[-1].replace(".json", ""), "%Y-%m-%d"))
 
-        contents = self.s3.serialize_json_files(json_files)
-        prompt = self.openAI.generate_prompt(
-            intro_and_outro, contents)
-        response = self.openAI.send_request(prompt)
-        result = self.openAI.parse_json_result(response)
+        return self.s3.serialize_json_files(json_files) or []
+
+    def make_newsletter(self, provider_id: str, locale: str, tags: List[str]):
+        # The digest kept by collect runs is normally all there is to fetch;
+        # providers without one yet fall back to reading every summary
+        digest = self.digest.load(provider_id)
+        if digest and digest.get("articles"):
+            contents = digest["articles"]
+            result = self.digest.current_intro(digest) or \
+                self._write_intro_outro(locale, tags, contents)
+        else:
+            contents = self._load_collection(provider_id)
+            result = self._write_intro_outro(locale, tags, contents)
 
         newsletter = {
             "title": f"{provider_id} Weekly Newsletter",
@@ -231,9 +463,13 @@ class NewsService:
         dispatch_date_str = dispatch_date.strftime("%Y-%m-%d")
         self.s3.upload_file_object(
             file_obj, f"{provider_id}/newsletter/{dispatch_date_str}.html")
-        self.express.dispatch_newsletter(
+        dispatched = self.express.dispatch_newsletter(
             provider_id, dispatch_date_str)
 
+        # A digest whose newsletter didn't go out is kept for the next build
+        if digest and dispatched:
+            self.digest.archive(provider_id, dispatch_date_str)
+
     def _create_html_doc(self, newsletter: dict) -> str:
         template = self.env.get_template("template.html")
         return template.render(newsletter)
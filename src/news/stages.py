@@ -0,0 +1,43 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+
+
+class StageScheduler:
+    """
+    Runs independent I/O stages of a job concurrently and records when each
+    one ran, so the report shows how much of the work overlapped
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.timings: List[Tuple[str, float, float]] = []
+        self.origin = time.perf_counter()
+
+    def __enter__(self) -> "StageScheduler":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.pool.shutdown(wait=True)
+
+    def submit(self, name: str, fn: Callable, *args: Any) -> Future:
+        """Start a stage in the background"""
+        return self.pool.submit(self.run, name, fn, *args)
+
+    def run(self, name: str, fn: Callable, *args: Any) -> Any:
+        """Run a stage on the calling thread"""
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.timings.append(
+                (name, start - self.origin, time.perf_counter() - self.origin))
+
+    def report(self) -> str:
+        wall = time.perf_counter() - self.origin
+        busy = sum(end - start for _, start, end in self.timings)
+        lines = [f"{name:<32} {start * 1000:9.1f}ms -> {end * 1000:9.1f}ms ({(end - start) * 1000:.1f}ms)"
+                 for name, start, end in sorted(self.timings, key=lambda t: t[1])]
+        lines.append(f"critical path {wall * 1000:.1f}ms for {busy * 1000:.1f}ms of stage time")
+        return "\n".join(lines)